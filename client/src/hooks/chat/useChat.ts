@@ -40,7 +40,8 @@ export function useChat() {
     if (!socketRef.current) {
       socketRef.current = io('http://localhost:2002', {
         path: '/socket.io',
-        transports: ['websocket', 'polling']
+        transports: ['websocket', 'polling'],
+        withCredentials: true
       })
     }
 
@@ -0,0 +1,133 @@
+"""
+bench_batch.py
+
+Measures batch job throughput of BatchRunner against fake vendors: prompts per
+second, the peak number of prompts in flight per provider, and how many bulk
+writes were needed. Two jobs on different providers run at the same time, the
+second provider being much slower, to show that per-provider limits keep the
+slow vendor from holding up the fast one.
+
+Usage (from the server directory):
+    python -m benchmarks.bench_batch --prompts 200
+"""
+
+import argparse
+import threading
+import time
+
+from src.services.batch_service import BatchRunner
+
+from .fake_provider import FakeProvider, FakeVendors
+
+CONFIGS = {
+    "serial": {"workers": 1, "limits": {"groq": 1, "google": 1}},
+    "pool_8": {"workers": 8, "limits": {"groq": 4, "google": 4}},
+    "pool_16": {"workers": 16, "limits": {"groq": 12, "google": 4}},
+    "pool_32": {"workers": 32, "limits": {"groq": 24, "google": 8}},
+}
+
+
+class Recorder:
+    """
+    Counts in-flight prompts per provider and bulk writes, in place of MongoDB.
+    """
+
+    def __init__(self, vendors: FakeVendors):
+        self.vendors = vendors
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.peak = {}
+        self.writes = 0
+        self.results = 0
+
+    def answer(self, provider: str, model_id: str, prompt: str):
+        """
+        Answer a prompt from the fake vendor while tracking concurrency.
+        """
+        with self.lock:
+            self.in_flight[provider] = self.in_flight.get(provider, 0) + 1
+            self.peak[provider] = max(
+                self.peak.get(provider, 0), self.in_flight[provider]
+            )
+        try:
+            return "".join(self.vendors.start(provider, model_id, prompt)), 0
+        finally:
+            with self.lock:
+                self.in_flight[provider] -= 1
+
+    def write(self, _job_id: str, results: list, _owner=None) -> bool:
+        """
+        Count a bulk write.
+        """
+        with self.lock:
+            if results:
+                self.writes += 1
+                self.results += len(results)
+        return True
+
+
+def run_config(name: str, config: dict, prompts: int) -> None:
+    """
+    Run one fast and one slow job concurrently and print throughput figures.
+    """
+    recorder = Recorder(
+        FakeVendors(
+            {
+                "groq": FakeProvider(first_token_delay=0.02, token_delay=0.001),
+                "google": FakeProvider(first_token_delay=0.2, token_delay=0.005),
+            }
+        )
+    )
+    runner = BatchRunner(
+        workers=config["workers"],
+        provider_limits=config["limits"],
+        default_limit=1,
+        answer=recorder.answer,
+        write=recorder.write,
+        flush_size=50,
+        flush_seconds=0.5,
+    )
+    elapsed = {}
+
+    def job(provider: str) -> None:
+        started = time.perf_counter()
+        runner.run(
+            provider,
+            provider,
+            f"fake-{provider}",
+            ((i, f"prompt {i}") for i in range(prompts)),
+        )
+        elapsed[provider] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=job, args=(p,)) for p in ("groq", "google")]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - started
+    runner.shutdown()
+
+    per_job = " ".join(
+        f"{p}={prompts / elapsed[p]:.1f}/s(peak {recorder.peak.get(p, 0)})"
+        for p in ("groq", "google")
+    )
+    print(
+        f"{name:8s} overall={2 * prompts / total:.1f} prompts/s {per_job} "
+        f"writes={recorder.writes} results={recorder.results}"
+    )
+
+
+def main():
+    """
+    Parse arguments and run every configuration.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompts", type=int, default=100)
+    args = parser.parse_args()
+    for name, config in CONFIGS.items():
+        run_config(name, config, args.prompts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+bench_failover.py
+
+Measures time-to-first-token and total latency of HedgedStream against fake
+vendors with injected delays and errors.
+
+Usage (from the server directory):
+    python -m benchmarks.bench_failover --runs 50
+"""
+
+import argparse
+import statistics
+import time
+
+from src.services.provider_service import HedgedStream, ProviderHealth, resolve_chain
+
+from .fake_provider import FakeProvider, FakeVendors
+
+SCENARIOS = {
+    "healthy": {
+        "groq": FakeProvider(first_token_delay=0.05, token_delay=0.001),
+        "openrouter": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+        "google": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+    },
+    "slow_primary": {
+        "groq": FakeProvider(first_token_delay=2.0, token_delay=0.001),
+        "openrouter": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+        "google": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+    },
+    "failing_primary": {
+        "groq": FakeProvider(error_rate=1.0),
+        "openrouter": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+        "google": FakeProvider(first_token_delay=0.1, token_delay=0.001),
+    },
+    "flaky_chain": {
+        "groq": FakeProvider(first_token_delay=0.05, error_rate=0.5, seed=1),
+        "openrouter": FakeProvider(first_token_delay=0.3, error_rate=0.3, seed=2),
+        "google": FakeProvider(first_token_delay=0.2, token_delay=0.001),
+    },
+}
+
+FALLBACKS = {"groq": ["openrouter:fake-or", "google:fake-gemini"]}
+
+
+def run_scenario(name: str, providers: dict, runs: int, timeout: float) -> None:
+    """
+    Run one scenario and print latency percentiles and winner counts.
+    """
+    vendors = FakeVendors(providers)
+    health = ProviderHealth(degraded_score=0.5, cooldown_seconds=5.0)
+    ttfts, totals, winners, errors = [], [], {}, 0
+    for _ in range(runs):
+        chain = resolve_chain("fake-groq", "groq", fallbacks=FALLBACKS, health=health)
+        stream = HedgedStream(chain, vendors.start, timeout, health)
+        started = time.perf_counter()
+        first = None
+        try:
+            for _delta in stream:
+                if first is None:
+                    first = time.perf_counter() - started
+        except Exception:  # pylint: disable=broad-exception-caught
+            errors += 1
+            continue
+        ttfts.append(first or 0.0)
+        totals.append(time.perf_counter() - started)
+        winner = stream.winner[0] if stream.winner else None
+        winners[winner] = winners.get(winner, 0) + 1
+
+    def pct(values, q):
+        return (
+            sorted(values)[min(len(values) - 1, int(q * len(values)))]
+            if values
+            else 0.0
+        )
+
+    print(
+        f"{name:16s} ttft p50={pct(ttfts, .5):.3f}s p99={pct(ttfts, .99):.3f}s "
+        f"total mean={statistics.fmean(totals) if totals else 0:.3f}s "
+        f"errors={errors} winners={winners}"
+    )
+
+
+def main():
+    """
+    Parse arguments and run every scenario.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--first-token-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+    for name, providers in SCENARIOS.items():
+        run_scenario(name, providers, args.runs, args.first_token_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+bench_search.py
+
+Measures full-text search latency over a synthetic corpus.
+
+Seeds a separate benchmark database with sessions and their search index
+entries, then times search_sessions for a mix of common, rare, phrase and
+multi-term queries. Requires MONGODB_URI to point at a disposable server.
+
+Usage (from the server directory):
+    python -m benchmarks.bench_search --sessions 100000 --users 10
+    python -m benchmarks.bench_search --skip-seed --queries 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.repositories import connection
+from src.repositories.search_repository import (
+    SEARCH_COLLECTION,
+    ensure_search_indexes,
+    index_session_messages,
+    search_sessions,
+)
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "tu", "ve", "zo", "ne", "shi", "pa", "du", "gri"]
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    """
+    Build a list of pseudo-words of two to four syllables.
+    """
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_text(vocabulary, rng: random.Random, length: int) -> str:
+    """
+    Draw a Zipf-like sentence from the vocabulary.
+    """
+    n = len(vocabulary)
+    return " ".join(
+        vocabulary[min(n - 1, int(rng.paretovariate(1.1)) - 1)] for _ in range(length)
+    )
+
+
+def seed(args, vocabulary, rng: random.Random) -> None:
+    """
+    Insert synthetic sessions and index them in batches.
+    """
+    db = connection.get_database()
+    db[connection.SESSIONS_COLLECTION].drop()
+    db[SEARCH_COLLECTION].drop()
+    ensure_search_indexes()
+    batch = []
+    started = time.perf_counter()
+    for i in range(args.sessions):
+        now = int(time.time()) - rng.randint(0, 86400 * 365)
+        messages = [
+            {
+                "role": "user" if j % 2 == 0 else "assistant",
+                "content": make_text(vocabulary, rng, rng.randint(8, 120)),
+                "created_at": now + j,
+            }
+            for j in range(args.messages)
+        ]
+        batch.append(
+            {
+                "session_id": f"bench-{i}",
+                "user_id": f"user-{i % args.users}",
+                "session_data": {"session_name": make_text(vocabulary, rng, 4)},
+                "memory": {"messages": messages},
+                "created_at": now,
+                "updated_at": now + args.messages,
+            }
+        )
+        if len(batch) == 1000:
+            db[connection.SESSIONS_COLLECTION].insert_many(batch)
+            for doc in batch:
+                index_session_messages(doc["session_id"], doc["user_id"], doc=doc)
+            batch = []
+    if batch:
+        db[connection.SESSIONS_COLLECTION].insert_many(batch)
+        for doc in batch:
+            index_session_messages(doc["session_id"], doc["user_id"], doc=doc)
+    print(f"seeded {args.sessions} sessions in {time.perf_counter() - started:.1f}s")
+
+
+async def run_queries(args, vocabulary, rng: random.Random) -> None:
+    """
+    Time a mix of query shapes and print latency percentiles per shape.
+    """
+    shapes = {
+        "common": lambda: vocabulary[rng.randint(0, 9)],
+        "rare": lambda: vocabulary[
+            rng.randint(len(vocabulary) // 2, len(vocabulary) - 1)
+        ],
+        "multi": lambda: " ".join(rng.sample(vocabulary[:200], 3)),
+        "phrase": lambda: f'"{vocabulary[rng.randint(0, 20)]} {vocabulary[rng.randint(0, 20)]}"',
+    }
+    for name, make_query in shapes.items():
+        timings = []
+        for _ in range(args.queries):
+            user_id = f"user-{rng.randrange(args.users)}"
+            started = time.perf_counter()
+            await search_sessions(user_id, make_query(), rng.randint(0, 2), 20)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(
+            f"{name:8s} p50={timings[len(timings) // 2]:.1f}ms "
+            f"p95={timings[int(len(timings) * .95)]:.1f}ms "
+            f"p99={timings[int(len(timings) * .99)]:.1f}ms"
+        )
+
+
+def main():
+    """
+    Parse arguments, seed the corpus and run the queries.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="MAIServant_bench")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    if args.db == connection.DEFAULT_DB_NAME:
+        parser.error("refusing to seed the application database")
+    connection.DEFAULT_DB_NAME = args.db
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    if not args.skip_seed:
+        seed(args, vocabulary, rng)
+    asyncio.run(run_queries(args, vocabulary, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+fake_provider.py
+
+This module provides a scriptable stand-in for an LLM vendor so that the provider
+failover, hedging and job-processing code paths can be exercised without network
+access or API keys.
+
+Classes:
+- FakeProvider: Streams canned tokens with injectable delays and failures.
+- FakeVendors: Maps provider names to FakeProvider instances and exposes a
+  `start(provider, model)` callable compatible with HedgedStream.
+"""
+
+import random
+import time
+from typing import Dict, Iterator, Optional
+
+
+class FakeProvider:
+    """
+    A fake streaming vendor.
+
+    Attributes:
+        first_token_delay (float): Seconds to wait before the first token.
+        token_delay (float): Seconds to wait between subsequent tokens.
+        error_rate (float): Probability that a call raises before streaming.
+        tokens (int): Number of tokens to stream per call.
+    """
+
+    def __init__(
+        self,
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+        error_rate: float = 0.0,
+        tokens: int = 20,
+        seed: Optional[int] = None,
+    ):
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def stream(self, model_id: str, prompt: str = "") -> Iterator[str]:
+        """
+        Stream fake tokens for a prompt.
+
+        Args:
+            model_id (str): Model ID, echoed into the tokens.
+            prompt (str): Prompt text, ignored apart from its length.
+
+        Raises:
+            RuntimeError: When the injected error rate triggers.
+
+        Yields:
+            str: Token deltas.
+        """
+        self.calls += 1
+        if self._random.random() < self.error_rate:
+            raise RuntimeError(f"fake provider error ({model_id})")
+        time.sleep(self.first_token_delay)
+        for i in range(self.tokens):
+            if i:
+                time.sleep(self.token_delay)
+            yield f"{model_id}-{len(prompt)}-{i} "
+
+
+class FakeVendors:
+    """
+    Registry of fake providers keyed by provider name.
+    """
+
+    def __init__(self, providers: Dict[str, FakeProvider]):
+        self.providers = providers
+
+    def start(self, provider: str, model_id: str, prompt: str = "") -> Iterator[str]:
+        """
+        Open a stream on the named fake provider.
+
+        Raises:
+            ValueError: If the provider is unknown.
+        """
+        if provider not in self.providers:
+            raise ValueError(f"Unknown provider: {provider}")
+        return self.providers[provider].stream(model_id, prompt)
@@ -3,44 +3,181 @@ agent_api.py
 
 This module defines the API routes for managing agent sessions in the application.
 It includes endpoints for listing sessions, retrieving messages from a session,
-renaming a session, and deleting a session. All routes require the authenticated user.
+renaming a session, deleting a session, bulk delete/archive jobs, NDJSON export,
+full-text search across sessions, and streaming an assistant answer over
+Server-Sent Events as a lighter alternative to the Socket.IO flow. All routes
+require the authenticated user, and read routes are rate limited per user. Read
+routes return ETags built from per-user and per-session version stamps and
+answer If-None-Match with 304.
 
 Dependencies:
 - FastAPI
 - User authentication via current_active_user
+- Per-user rate limiting via rate_limited
 - Agent session and message models
 - Repository functions for database interactions
 """
 
+import asyncio
+import json
+import math
+import threading
 from typing import List, Optional
 
-from fastapi import APIRouter, Body, Depends, Query, Response
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
 
-from ..models.agent_session import AgentMessage, AgentSession
+from ..models.agent_session import (
+    AgentMessage,
+    AgentSession,
+    GenerationRequest,
+    SearchResults,
+)
+from ..models.bulk_job import BulkJob, BulkSessionRequest
 from ..models.user import User
 from ..repositories.agent_repository import (
     delete_session_in_db,
     get_session_messages,
     get_sessions_by_user,
+    iter_session_export,
     rename_session_in_db,
+    restore_session_in_db,
 )
+from ..repositories.bulk_repository import create_bulk_job, get_bulk_job, run_bulk_job
+from ..repositories.connection import get_agent_storage
+from ..repositories.search_repository import search_sessions
+from ..repositories.version_repository import get_session_version, get_user_version
 from ..services.auth_service import current_active_user
+from ..services.drain_service import generation_drain
+from ..services.etag_service import (
+    CACHE_CONTROL,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+)
+from ..services.generation_service import (
+    Generation,
+    check_generation_limits,
+    find_session,
+)
+from ..services.rate_limit_service import READS, rate_limited
 
 router = APIRouter()
 
 
 @router.get("/sessions", response_model=List[AgentSession])
-async def list_sessions(user: User = Depends(current_active_user)):
+async def list_sessions(
+    request: Request,
+    response: Response,
+    archived: bool = False,
+    user: User = Depends(rate_limited(READS)),
+):
     """
     Retrieve all agent sessions associated with the current authenticated user.
 
     Parameters:
+        request (Request): The incoming request, checked for If-None-Match.
+        response (Response): The outgoing response, used to set the ETag.
+        archived (bool): List archived sessions instead of active ones.
         user (User): The currently authenticated user (injected via dependency).
 
     Returns:
-        List[AgentSession]: A list of agent sessions owned by the user.
+        List[AgentSession]: A list of agent sessions owned by the user,
+        or an empty 304 response if the client's copy is current.
     """
-    return await get_sessions_by_user(user)
+    user_id = str(user.id)
+    etag = make_etag("sessions", user_id, get_user_version(user_id), archived)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return await get_sessions_by_user(user, archived)
+
+
+@router.get("/export")
+async def export_sessions(user: User = Depends(rate_limited(READS))):
+    """
+    Export all of the current user's sessions and messages.
+
+    Parameters:
+        user (User): The currently authenticated user.
+
+    Returns:
+        StreamingResponse: An application/x-ndjson stream with one session per line.
+    """
+    return StreamingResponse(
+        iter_session_export(user),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="sessions.ndjson"'},
+    )
+
+
+@router.post("/sessions/bulk", response_model=BulkJob, status_code=202)
+async def bulk_sessions(
+    request: BulkSessionRequest,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(current_active_user),
+):
+    """
+    Delete, archive or unarchive many sessions of the current user in the background.
+
+    Parameters:
+        request (BulkSessionRequest): The action and the session filter.
+        background_tasks (BackgroundTasks): Runs the job after the response is sent.
+        user (User): The currently authenticated user.
+
+    Returns:
+        BulkJob: The accepted job; poll /jobs/{job_id} for progress.
+    """
+    job = await create_bulk_job(user, request)
+    background_tasks.add_task(run_bulk_job, job.job_id, str(user.id), request)
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=BulkJob)
+async def get_job(job_id: str, user: User = Depends(rate_limited(READS))):
+    """
+    Retrieve the progress of a bulk job.
+
+    Parameters:
+        job_id (str): The ID returned when the job was submitted.
+        user (User): The currently authenticated user.
+
+    Returns:
+        BulkJob: The job's status and processed/total counts.
+    """
+    return await get_bulk_job(job_id, user)
+
+
+@router.get("/search", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=50),
+    user: User = Depends(rate_limited(READS)),
+):
+    """
+    Search the titles and messages of the current user's sessions.
+
+    Parameters:
+        q (str): Search terms; quoted phrases and -negations are supported.
+        page (int): Zero-based page number.
+        limit (int): Hits per page (default 20, between 1 and 50).
+        user (User): The currently authenticated user.
+
+    Returns:
+        SearchResults: Hits ranked by relevance, with highlighted snippets.
+    """
+    return await search_sessions(str(user.id), q, page, limit)
 
 
 @router.get(
@@ -48,24 +185,52 @@ async def list_sessions(user: User = Depends(current_active_user)):
     response_model=List[AgentMessage],
 )
 async def get_messages(
+    request: Request,
+    response: Response,
     session_id: str,
     limit: int = Query(4, ge=1, le=100),
     before: Optional[str] = None,
-    user: User = Depends(current_active_user),
+    user: User = Depends(rate_limited(READS)),
 ):
     """
     Retrieve messages from a specific agent session.
 
     Parameters:
+        request (Request): The incoming request, checked for If-None-Match.
+        response (Response): The outgoing response, used to set the ETag.
         session_id (str): The ID of the session to retrieve messages from.
         limit (int): The number of messages to return (default 4, between 1 and 100).
         before (Optional[str]): An optional message ID to paginate results.
         user (User): The currently authenticated user.
 
+    Raises:
+        HTTPException: 404 if the session does not exist or was deleted,
+                       403 if it belongs to another user. Both are checked
+                       before the ETag, so non-owners never get a 304.
+
     Returns:
-        List[AgentMessage]: A list of messages from the specified session.
+        List[AgentMessage]: A list of messages from the specified session,
+        or an empty 304 response if the client's copy is current.
     """
-    return await get_session_messages(session_id, user, limit, before)
+    owner = find_session(await get_agent_storage(), session_id)
+    if not owner or "deleted_at" in owner:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if owner.get("user_id") != str(user.id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    etag = make_etag(
+        "messages",
+        str(user.id),
+        session_id,
+        get_session_version(session_id),
+        limit,
+        before,
+    )
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    messages = await get_session_messages(session_id, user, limit, before)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return messages
 
 
 @router.patch("/sessions/{session_id}", response_model=AgentSession)
@@ -96,6 +261,9 @@ async def delete_session(
     """
     Delete a session owned by the current user.
 
+    The session disappears immediately but can be restored until the undo
+    window passes, after which it is purged in the background.
+
     Parameters:
         session_id (str): The ID of the session to delete.
         user (User): The currently authenticated user.
@@ -105,3 +273,120 @@ async def delete_session(
     """
     await delete_session_in_db(session_id, user)
     return Response(status_code=204)
+
+
+@router.post("/sessions/{session_id}/restore", response_model=AgentSession)
+async def restore_session(
+    session_id: str,
+    user: User = Depends(current_active_user),
+):
+    """
+    Undo the deletion of a session within the undo window.
+
+    Parameters:
+        session_id (str): The ID of the deleted session.
+        user (User): The currently authenticated user.
+
+    Returns:
+        AgentSession: The restored session.
+    """
+    return await restore_session_in_db(session_id, user)
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.post("/sessions/{session_id}/stream")
+async def stream_answer(
+    session_id: str,
+    body: GenerationRequest,
+    user: User = Depends(current_active_user),
+):
+    """
+    Stream an assistant answer for a session as Server-Sent Events.
+
+    Runs the same generation pipeline as the Socket.IO 'init_session' handler.
+    Emits 'delta' events with new content, then a single 'done' or 'error' event
+    after which the stream closes. The title of a new session is still generated
+    and stored after the stream closes. If the client disconnects early, the
+    generation is cancelled and not persisted.
+
+    Parameters:
+        session_id (str): The ID of the session to answer in (created if new).
+        body (GenerationRequest): The model, provider and prompt to use.
+        user (User): The currently authenticated user.
+
+    Raises:
+        HTTPException: 403 if the session belongs to another user,
+                       404 if the session was deleted,
+                       429 with Retry-After if the user is rate limited,
+                       503 with Retry-After if the server is shutting down.
+
+    Returns:
+        StreamingResponse: A text/event-stream response.
+    """
+    if not generation_drain.accepting:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is shutting down",
+            headers={"Retry-After": "1"},
+        )
+    user_id = str(user.id)
+    storage = await get_agent_storage()
+    existing = find_session(storage, session_id)
+    if existing and existing.get("user_id") != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if existing and "deleted_at" in existing:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    limited = check_generation_limits(user_id)
+    if limited:
+        bucket, retry_after = limited
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded: {bucket}",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        cancel = threading.Event()
+
+        def put(event: str, payload: dict):
+            loop.call_soon_threadsafe(events.put_nowait, (event, payload))
+
+        def on_done(content: str, error: Optional[str]):
+            if error:
+                put("error", {"session_id": session_id, "error": error})
+            else:
+                put("done", {"session_id": session_id, "content": content})
+
+        generation = Generation(
+            storage=storage,
+            session_id=session_id,
+            user_id=user_id,
+            model_id=body.model,
+            provider=body.provider,
+            prompt=body.prompt,
+            is_new_session=existing is None,
+            on_delta=lambda delta, _content: put("delta", {"content": delta}),
+            on_done=on_done,
+            cancel=cancel,
+        )
+        generation_drain.submit(generation)
+        try:
+            while True:
+                event, payload = await events.get()
+                yield _sse(event, payload)
+                if event in ("done", "error"):
+                    return
+        finally:
+            cancel.set()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
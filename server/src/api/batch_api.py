@@ -0,0 +1,158 @@
+"""
+batch_api.py
+
+This module defines the API routes for batch prompt jobs: submitting a batch of
+prompts to run against one provider/model, polling a job's progress, paging
+through its results and streaming them as they are written. Submitting is
+reserved to superusers (internal users running evaluations); the other routes
+require the authenticated user and are rate limited per user.
+
+Dependencies:
+- FastAPI
+- User authentication via current_superuser
+- Per-user rate limiting via rate_limited
+- Batch job models and repository functions
+- The batch worker, woken up when a job is submitted
+"""
+
+import asyncio
+import json
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..config.config import settings
+from ..models.batch_job import BatchJob, BatchPromptRequest, BatchResultPage
+from ..models.user import User
+from ..repositories.batch_repository import (
+    create_batch_job,
+    get_batch_job,
+    get_batch_results,
+)
+from ..services.auth_service import current_superuser
+from ..services.batch_service import batch_worker
+from ..services.provider_service import PROVIDERS
+from ..services.rate_limit_service import READS, TOKENS, rate_limited, rate_limiter
+
+router = APIRouter()
+
+FINISHED = ("done", "failed")
+STREAM_PAGE_SIZE = 100
+
+
+@router.post("/jobs", response_model=BatchJob, status_code=202)
+async def submit_batch(
+    request: BatchPromptRequest,
+    user: User = Depends(current_superuser),
+):
+    """
+    Queue a batch of prompts to be answered by the worker pool.
+
+    Tokens used by the batch are charged to the user's token bucket as results
+    are written.
+
+    Parameters:
+        request (BatchPromptRequest): The provider, model and prompts.
+        user (User): The currently authenticated superuser.
+
+    Raises:
+        HTTPException: 403 if the user is not a superuser,
+                       400 if the provider is unknown or the batch is too large,
+                       429 with Retry-After if the user is out of LLM tokens.
+
+    Returns:
+        BatchJob: The pending job, with 202 Accepted.
+    """
+    if request.provider.lower() not in PROVIDERS:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown provider: {request.provider}"
+        )
+    if len(request.prompts) > settings.batch_max_prompts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.batch_max_prompts} prompts",
+        )
+    retry_after = rate_limiter.hit(TOKENS, str(user.id), 0)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    job = await create_batch_job(user, request)
+    batch_worker.notify()
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=BatchJob)
+async def get_job(job_id: str, user: User = Depends(rate_limited(READS))):
+    """
+    Retrieve the progress of a batch job.
+
+    Parameters:
+        job_id (str): The ID returned when the job was submitted.
+        user (User): The currently authenticated user.
+
+    Returns:
+        BatchJob: The job's status and completed/failed/total counts.
+    """
+    return await get_batch_job(job_id, user)
+
+
+@router.get("/jobs/{job_id}/results", response_model=BatchResultPage)
+async def get_results(
+    job_id: str,
+    after: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    user: User = Depends(rate_limited(READS)),
+):
+    """
+    Page through the results written so far, in completion order.
+
+    Parameters:
+        job_id (str): The job ID.
+        after (int): The `next_after` cursor of the previous page (0 to start).
+        limit (int): Results per page (default 100, between 1 and 500).
+        user (User): The currently authenticated user.
+
+    Returns:
+        BatchResultPage: The results and the cursor for the next page. Once the
+        status is "done" or "failed", an empty page means every result was read.
+    """
+    job = await get_batch_job(job_id, user)
+    results = get_batch_results(job_id, after, limit)
+    next_after = results[-1].seq if results else after
+    return BatchResultPage(results=results, next_after=next_after, status=job.status)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_results(job_id: str, user: User = Depends(rate_limited(READS))):
+    """
+    Stream a job's results as they are written, until the job finishes.
+
+    Parameters:
+        job_id (str): The job ID.
+        user (User): The currently authenticated user.
+
+    Returns:
+        StreamingResponse: An application/x-ndjson stream with one result per line.
+    """
+    await get_batch_job(job_id, user)
+
+    async def result_stream():
+        after = 0
+        while True:
+            # Read the status first: a finished job has written all of its results.
+            status = (await get_batch_job(job_id, user)).status
+            results = get_batch_results(job_id, after, STREAM_PAGE_SIZE)
+            for result in results:
+                yield json.dumps(result.model_dump()) + "\n"
+            if results:
+                after = results[-1].seq
+                continue
+            if status in FINISHED:
+                return
+            await asyncio.sleep(settings.batch_flush_seconds)
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
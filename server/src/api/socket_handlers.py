@@ -5,60 +5,34 @@ This module defines Socket.IO event handlers for managing real-time communicatio
 between the client and server in a chat-based agent application.
 
 Features include:
-- Handling client connections
+- Authenticating clients from the auth cookie when they connect
 - Initializing agent sessions
 - Streaming assistant responses
 - Dynamically generating session titles
 - Synchronizing stream readiness between client and server
+- Falling back to other providers when the selected one is slow or failing
+- Rate limiting generations and LLM tokens per user
 
 Dependencies:
 - Asyncio for event-based concurrency
-- agno agent and model providers (Google, Cohere, Mistral, Groq, OpenRouter)
+- The generation service (agno agents, provider fallback chains, rate limits)
 - Socket.IO for real-time bidirectional communication
 - MongoDB for session persistence
 """
 
 import asyncio
 
-from agno.agent import Agent
-from agno.models.cohere import Cohere
-from agno.models.google import Gemini
-from agno.models.groq import Groq
-from agno.models.mistral import MistralChat
-from agno.models.openrouter import OpenRouter
+from socketio.exceptions import ConnectionRefusedError as SocketConnectionRefused
 
-from ..config.config import settings
 from ..main import socket_manager
 from ..repositories.connection import get_agent_storage
-
-
-def make_model(id: str, provider: str):
-    """
-    Factory function that returns a model instance based on the provider name.
-
-    Parameters:
-        id (str): Model ID to use.
-        provider (str): Name of the provider (e.g., 'google', 'cohere').
-
-    Returns:
-        An instance of the corresponding model class with configured API key.
-
-    Raises:
-        ValueError: If the provider is unknown.
-    """
-    p = (provider or "").lower()
-    if p == "google":
-        return Gemini(id=id, api_key=settings.google_api_key)
-    if p == "cohere":
-        return Cohere(id=id, api_key=settings.co_api_key)
-    if p == "mistral":
-        return MistralChat(id=id, api_key=settings.mistral_api_key)
-    if p == "groq":
-        return Groq(id=id, api_key=settings.groq_api_key)
-    if p == "openrouter":
-        return OpenRouter(id=id, api_key=settings.openrouter_api_key)
-    raise ValueError(f"Unknown provider: {provider}")
-
+from ..services.auth_service import user_from_cookie_header
+from ..services.drain_service import generation_drain
+from ..services.generation_service import (
+    Generation,
+    check_generation_limits,
+    find_session,
+)
 
 # Dictionary to coordinate session stream readiness across async coroutines
 stream_ready_events = {}
@@ -69,10 +43,20 @@ async def on_connect(sid, environ):
     """
     Event handler triggered when a client connects to the WebSocket.
 
+    The client is authenticated from the auth cookie and its user ID is kept in
+    the socket session; events never trust a user ID sent by the client.
+
     Parameters:
         sid (str): The session ID assigned to the connected client.
         environ (dict): The connection environment metadata.
+
+    Raises:
+        ConnectionRefusedError: If the client is not an authenticated active user.
     """
+    user = await user_from_cookie_header(environ.get("HTTP_COOKIE", ""))
+    if user is None:
+        raise SocketConnectionRefused("Not authenticated")
+    await socket_manager.save_session(sid, {"user_id": str(user.id)})
     print(f"Client connected: {sid}")
 
 
@@ -88,98 +72,111 @@ async def init_session(sid, data):
                      - model (str)
                      - provider (str)
                      - prompt (str)
-                     - user_id (str)
                      - is_new (bool)
 
     Behavior:
+        - Emits 'server_draining' and stops if the server is shutting down.
+        - Finishes immediately with an error 'done' chunk if the session was deleted
+          or belongs to another user.
+        - Emits 'rate_limited' with a retry_after value and stops if the user
+          authenticated on connect is out of generations or LLM tokens.
         - Joins the client to the corresponding session room.
-        - Creates an agent with the selected model.
         - If the session is new, waits for a 'stream_ready' signal.
-        - Streams assistant response back to the client incrementally.
-        - If the session is new, generates and stores a title summarizing the conversation.
+        - Runs the generation pipeline in an executor thread, streaming the assistant
+          response back to the client incrementally and finishing with a 'done' chunk
+          ('error' is set when every provider in the fallback chain failed).
+        - If the session is new, emits the generated title summarizing the conversation.
     """
     session_id = data["session_id"]
     model_id = data["model"]
     provider = data["provider"]
     prompt = data["prompt"]
-    user_id = data["user_id"]
+    user_id = (await socket_manager.get_session(sid))["user_id"]
     is_new = data.get("is_new", False)
 
-    await socket_manager.enter_room(sid, session_id)
+    if not generation_drain.accepting:
+        await socket_manager.emit(
+            "server_draining", {"session_id": session_id, "reconnect": True}, to=sid
+        )
+        return
 
     storage = await get_agent_storage()
-    existing = storage.collection.find_one({"session_id": session_id})
+    existing = find_session(storage, session_id)
+    if existing and ("deleted_at" in existing or existing.get("user_id") != user_id):
+        await socket_manager.emit(
+            "assistant_stream",
+            {
+                "session_id": session_id,
+                "content": "",
+                "done": True,
+                "error": "Session not found",
+            },
+            to=sid,
+        )
+        return
     is_new_session = existing is None
 
+    limited = check_generation_limits(user_id)
+    if limited:
+        bucket, retry_after = limited
+        await socket_manager.emit(
+            "rate_limited",
+            {"session_id": session_id, "bucket": bucket, "retry_after": retry_after},
+            to=sid,
+        )
+        return
+
+    await socket_manager.enter_room(sid, session_id)
+
     if is_new:
         stream_ready_events[session_id] = asyncio.Event()
         await stream_ready_events[session_id].wait()
         del stream_ready_events[session_id]
 
-    agent = Agent(
-        model=make_model(model_id, provider),
-        storage=storage,
-        session_id=session_id,
-        user_id=user_id,
-        markdown=True,
-        add_history_to_messages=not is_new_session,
-    )
-
     loop = asyncio.get_event_loop()
 
-    def run_and_emit():
+    def emit(event: str, payload: dict):
         """
-        Runs the agent and emits assistant response chunks via WebSocket.
-
-        Also generates a session title for new sessions and emits it to the client.
+        Schedules a room emit on the event loop from the executor thread.
         """
-        full_response = ""
-        for chunk in agent.run(prompt, stream=True):
-            full_response += chunk.content
-            asyncio.run_coroutine_threadsafe(
-                socket_manager.emit(
-                    "assistant_stream",
-                    {"session_id": session_id, "content": full_response},
-                    room=session_id,
-                ),
-                loop,
-            )
         asyncio.run_coroutine_threadsafe(
-            socket_manager.emit(
-                "assistant_stream",
-                {"session_id": session_id, "content": full_response, "done": True},
-                room=session_id,
-            ),
-            loop,
+            socket_manager.emit(event, payload, room=session_id), loop
         )
 
-        if is_new_session:
-            title_agent = Agent(
-                model=make_model(model_id, provider),
-                storage=None,
-                markdown=False,
-            )
-            title_prompt = (
-                f"Generate a short conversation title (must be less than 40 chars, your response purely "
-                f"contains ONLY the title, no quotation marks at the begin or end) summarizing the "
-                f"following response:\n{full_response}"
-            )
-            title = title_agent.run(title_prompt).content or "Untitled"
-
-            storage.collection.update_one(
-                {"session_id": session_id},
-                {"$set": {"session_data.session_name": title}},
-            )
-            asyncio.run_coroutine_threadsafe(
-                socket_manager.emit(
-                    "session_title",
-                    {"session_id": session_id, "title": title},
-                    room=session_id,
-                ),
-                loop,
-            )
-
-    loop.run_in_executor(None, run_and_emit)
+    def on_delta(_delta: str, content: str):
+        """
+        Emits the full response so far.
+        """
+        emit("assistant_stream", {"session_id": session_id, "content": content})
+
+    def on_done(content: str, error):
+        """
+        Emits the final chunk, with the error message if the generation failed.
+        """
+        payload = {"session_id": session_id, "content": content, "done": True}
+        if error:
+            payload["error"] = error
+        emit("assistant_stream", payload)
+
+    def on_title(title: str):
+        """
+        Emits the generated title of a new session.
+        """
+        emit("session_title", {"session_id": session_id, "title": title})
+
+    generation = Generation(
+        storage=storage,
+        session_id=session_id,
+        user_id=user_id,
+        model_id=model_id,
+        provider=provider,
+        prompt=prompt,
+        is_new_session=is_new_session,
+        on_delta=on_delta,
+        on_done=on_done,
+        on_title=on_title,
+    )
+    generation_drain.submit(generation)
 
 
 @socket_manager.on("stream_ready")
@@ -5,6 +5,8 @@ This module defines the Settings class, which loads configuration
 variables from environment variables using Pydantic's BaseSettings.
 """
 
+from typing import Dict, List
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,6 +19,36 @@ class Settings(BaseSettings):
         database_url (str): MongoDB connection URI.
         port (int): Port number for the FastAPI application.
         google_api_key (str): API key for accessing Google services.
+        provider_fallbacks (Dict[str, List[str]]): Fallback chains keyed by
+            "provider:model" or "provider", with "provider:model" entries.
+        first_token_timeout (float): Seconds without a first token before a
+            hedged request is sent to the next provider in the chain.
+        provider_degraded_score (float): Failure score at which a provider is skipped.
+        provider_cooldown_seconds (float): How long a degraded provider is skipped for.
+        rate_limit_backend (str): "memory" or "mongo" storage for rate-limit buckets.
+        rate_limit_generations_per_minute (float): Generations a user may start per minute.
+        rate_limit_tokens_per_hour (float): LLM tokens a user may consume per hour.
+        rate_limit_reads_per_minute (float): REST reads a user may make per minute.
+            A limit of 0 disables the corresponding bucket.
+        cold_session_age_days (float): Idle age after which sessions move to
+            compressed cold storage (0 disables the archiver).
+        cold_archiver_interval_seconds (float): Delay between archiver cycles.
+        cold_archiver_batch_size (int): Sessions frozen per archiver batch.
+        session_undo_window_seconds (float): How long a deleted session can be restored.
+        purge_interval_seconds (float): Delay between purger cycles.
+        purge_batch_size (int): Tombstoned sessions removed per purge batch.
+        purge_batch_pause_seconds (float): Pause between purge batches.
+        shutdown_drain_seconds (float): How long shutdown waits for in-flight generations.
+        batch_workers (int): Threads answering batch prompts across all jobs.
+        batch_provider_concurrency (Dict[str, int]): Batch prompts in flight allowed
+            per provider.
+        batch_default_provider_concurrency (int): Limit for providers not listed above.
+        batch_max_prompts (int): Largest batch accepted in one job.
+        batch_concurrent_jobs (int): Batch jobs run at once per instance.
+        batch_flush_size (int): Batch results buffered before a bulk write.
+        batch_flush_seconds (float): Longest delay between batch result writes.
+        batch_job_lease_seconds (float): Heartbeat age after which a running batch
+            job is considered orphaned and claimed again.
     """
 
     model_config = SettingsConfigDict(
@@ -32,6 +64,46 @@ class Settings(BaseSettings):
     openrouter_api_key: str = Field(..., alias="OPENROUTER_API_KEY")
     access_public_key: str = Field(..., alias="ACCESS_PUBLIC_KEY")
     access_private_key: str = Field(..., alias="ACCESS_PRIVATE_KEY")
+    provider_fallbacks: Dict[str, List[str]] = Field(
+        default_factory=dict, alias="PROVIDER_FALLBACKS"
+    )
+    first_token_timeout: float = Field(8.0, alias="FIRST_TOKEN_TIMEOUT")
+    provider_degraded_score: float = Field(0.5, alias="PROVIDER_DEGRADED_SCORE")
+    provider_cooldown_seconds: float = Field(60.0, alias="PROVIDER_COOLDOWN_SECONDS")
+    rate_limit_backend: str = Field("memory", alias="RATE_LIMIT_BACKEND")
+    rate_limit_generations_per_minute: float = Field(
+        10.0, alias="RATE_LIMIT_GENERATIONS_PER_MINUTE"
+    )
+    rate_limit_tokens_per_hour: float = Field(
+        200_000.0, alias="RATE_LIMIT_TOKENS_PER_HOUR"
+    )
+    rate_limit_reads_per_minute: float = Field(
+        120.0, alias="RATE_LIMIT_READS_PER_MINUTE"
+    )
+    cold_session_age_days: float = Field(90.0, alias="COLD_SESSION_AGE_DAYS")
+    cold_archiver_interval_seconds: float = Field(
+        3600.0, alias="COLD_ARCHIVER_INTERVAL_SECONDS"
+    )
+    cold_archiver_batch_size: int = Field(100, alias="COLD_ARCHIVER_BATCH_SIZE")
+    session_undo_window_seconds: float = Field(
+        600.0, alias="SESSION_UNDO_WINDOW_SECONDS"
+    )
+    purge_interval_seconds: float = Field(300.0, alias="PURGE_INTERVAL_SECONDS")
+    purge_batch_size: int = Field(100, alias="PURGE_BATCH_SIZE")
+    purge_batch_pause_seconds: float = Field(1.0, alias="PURGE_BATCH_PAUSE_SECONDS")
+    shutdown_drain_seconds: float = Field(25.0, alias="SHUTDOWN_DRAIN_SECONDS")
+    batch_workers: int = Field(16, alias="BATCH_WORKERS")
+    batch_provider_concurrency: Dict[str, int] = Field(
+        default_factory=dict, alias="BATCH_PROVIDER_CONCURRENCY"
+    )
+    batch_default_provider_concurrency: int = Field(
+        4, alias="BATCH_DEFAULT_PROVIDER_CONCURRENCY"
+    )
+    batch_max_prompts: int = Field(1000, alias="BATCH_MAX_PROMPTS")
+    batch_concurrent_jobs: int = Field(2, alias="BATCH_CONCURRENT_JOBS")
+    batch_flush_size: int = Field(50, alias="BATCH_FLUSH_SIZE")
+    batch_flush_seconds: float = Field(2.0, alias="BATCH_FLUSH_SECONDS")
+    batch_job_lease_seconds: float = Field(120.0, alias="BATCH_JOB_LEASE_SECONDS")
 
 
 settings = Settings()
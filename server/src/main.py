@@ -2,10 +2,14 @@
 Main entry point for the FastAPI application.
 
 This module sets up the application configuration, initializes the database connection
-via a lifespan context, and includes API routers.
+via a lifespan context, and includes API routers. Shutdown signals start draining
+in-flight generations while clients are still connected; the lifespan then waits
+for the drain before closing the database and provider clients.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+from typing import Optional
 
 import src.api.socket_handlers
 import uvicorn
@@ -14,17 +18,89 @@ from fastapi_socketio import SocketManager
 
 from .api.agent_api import router as agent_router
 from .api.auth_api import router as auth_router
+from .api.batch_api import router as batch_router
 from .config.config import settings
-from .repositories.connection import init_db
+from .repositories.agent_repository import ensure_purge_index
+from .repositories.batch_repository import ensure_batch_indexes
+from .repositories.cold_storage_repository import ensure_cold_storage_indexes
+from .repositories.connection import close_db, init_db
+from .repositories.search_repository import backfill_search_index, ensure_search_indexes
+from .services.batch_service import batch_worker
+from .services.bulk_service import run_bulk_job_recovery
+from .services.cold_storage_service import run_cold_storage_archiver
+from .services.drain_service import drain_on_shutdown_signal, generation_drain
+from .services.provider_service import close_provider_clients
+from .services.purge_service import run_session_purger
+
+_drain_task: Optional[asyncio.Task] = None
+
+
+async def _drain() -> None:
+    generation_drain.accepting = False
+    batch_worker.stop()
+    try:
+        await socket_manager.emit("server_draining", {"reconnect": True})
+    except Exception:  # pylint: disable=broad-exception-caught
+        pass
+    await asyncio.gather(
+        generation_drain.drain(settings.shutdown_drain_seconds),
+        batch_worker.wait(settings.shutdown_drain_seconds),
+    )
+
+
+def start_drain() -> asyncio.Task:
+    """
+    Start draining generations and batch jobs, once.
+
+    Returns:
+        asyncio.Task: The drain, shared by every caller.
+    """
+    global _drain_task  # pylint: disable=global-statement
+    if _drain_task is None:
+        _drain_task = asyncio.ensure_future(_drain())
+    return _drain_task
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """
-    Lifespan context manager that initializes the database connection.
+    Lifespan context manager that initializes the database connection and the
+    search index, backfilling sessions that predate it in the background, and
+    runs the cold storage archiver, the deleted-session purger, the batch job
+    worker and the recovery of interrupted bulk jobs until shutdown.
+
+    Shutdown sequence, steps 1-3 starting on SIGINT/SIGTERM before uvicorn stops
+    listening and closes connections:
+      1. Stop accepting generations and batch jobs.
+      2. Tell connected clients to reconnect to another instance.
+      3. Wait up to settings.shutdown_drain_seconds for in-flight generations,
+         including their persistence and title generation, then cancel the rest.
+         Batch jobs meanwhile write their in-flight results and go back to the
+         queue to be resumed.
+      4. Stop the background tasks, wait for the drain if the lifespan ended
+         without a signal, and close the provider HTTP clients and the MongoDB
+         clients.
     """
     await init_db()
+    ensure_search_indexes()
+    ensure_cold_storage_indexes()
+    ensure_purge_index()
+    ensure_batch_indexes()
+    drain_on_shutdown_signal(start_drain)
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, backfill_search_index)
+    background = [
+        asyncio.create_task(run_cold_storage_archiver()),
+        asyncio.create_task(run_session_purger()),
+        asyncio.create_task(batch_worker.run()),
+        asyncio.create_task(run_bulk_job_recovery()),
+    ]
     yield
+    for task in background:
+        task.cancel()
+    await start_drain()
+    await close_provider_clients()
+    close_db()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -32,6 +108,7 @@ socket_manager = SocketManager(app=app, mount_location="/socket.io")
 
 app.include_router(auth_router, prefix="/api/auth")
 app.include_router(agent_router, prefix="/api/chat/agent", tags=["agent"])
+app.include_router(batch_router, prefix="/api/chat/batch", tags=["batch"])
 
 if __name__ == "__main__":
     uvicorn.run("src.main:app", host="0.0.0.0", port=settings.port, reload=True)
@@ -9,10 +9,12 @@ Models:
 - AgentData: Wraps the model configuration metadata.
 - AgentMessage: Represents a message in the chat session.
 - AgentSession: Represents a chat session with metadata, associated model, and timestamps.
+- GenerationRequest: Body of an HTTP streaming generation request.
+- SearchHit / SearchResults: Ranked full-text search results over sessions.
 """
 
 from datetime import datetime
-from typing import Literal, Optional
+from typing import List, Literal, Optional, Tuple
 
 from pydantic import BaseModel, computed_field
 
@@ -68,6 +70,7 @@ class AgentSession(BaseModel):
         agent_data (AgentData): Model metadata used for the session.
         created_at (datetime): When the session was initially created.
         updated_at (datetime): When the session was last modified.
+        archived (bool): Whether the user archived the session.
     """
 
     session_id: str
@@ -75,6 +78,7 @@ class AgentSession(BaseModel):
     agent_data: AgentData
     created_at: datetime
     updated_at: datetime
+    archived: bool = False
 
     @computed_field
     @property
@@ -86,3 +90,58 @@ class AgentSession(BaseModel):
             Optional[str]: The session title, if available.
         """
         return self.session_data.get("session_name")
+
+
+class GenerationRequest(BaseModel):
+    """
+    Body of a request to stream an assistant answer over HTTP.
+
+    Attributes:
+        model (str): Identifier of the model to use.
+        provider (str): Name of the model provider.
+        prompt (str): The user message to answer.
+    """
+
+    model: str
+    provider: str
+    prompt: str
+
+
+class SearchHit(BaseModel):
+    """
+    A single full-text search match in a user's conversations.
+
+    Attributes:
+        session_id (str): The session containing the match.
+        title (Optional[str]): Current title of that session.
+        role (Literal["user", "assistant", "title"]): What matched.
+        snippet (str): Excerpt of the matching text.
+        highlights (List[Tuple[int, int]]): [start, end) offsets of query terms in the snippet.
+        score (float): Text relevance score.
+        created_at (datetime): When the matching message or title was written.
+    """
+
+    session_id: str
+    title: Optional[str]
+    role: Literal["user", "assistant", "title"]
+    snippet: str
+    highlights: List[Tuple[int, int]]
+    score: float
+    created_at: datetime
+
+
+class SearchResults(BaseModel):
+    """
+    A page of search hits.
+
+    Attributes:
+        hits (List[SearchHit]): Matches ordered by relevance.
+        page (int): Zero-based page number.
+        limit (int): Page size.
+        has_more (bool): Whether another page exists.
+    """
+
+    hits: List[SearchHit]
+    page: int
+    limit: int
+    has_more: bool
@@ -0,0 +1,98 @@
+"""
+batch_job.py
+
+This module defines Pydantic models for batch prompt jobs: a list of prompts run
+against one provider/model by the background worker pool, and the per-prompt
+results they produce.
+
+Models:
+- BatchPromptRequest: Provider, model and prompts of a batch job.
+- BatchJob: Progress and outcome of a batch job.
+- BatchResult: The answer or error for one prompt of a batch.
+- BatchResultPage: A page of results, in completion order.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchPromptRequest(BaseModel):
+    """
+    A batch of prompts to run against a single model.
+
+    Attributes:
+        provider (str): Provider name, as accepted by make_model.
+        model_id (str): Model ID on that provider.
+        prompts (List[str]): The prompts, answered independently without history.
+    """
+
+    provider: str
+    model_id: str
+    prompts: List[str] = Field(..., min_length=1)
+
+
+class BatchJob(BaseModel):
+    """
+    Progress of a batch prompt job.
+
+    Attributes:
+        job_id (str): Unique identifier of the job.
+        provider (str): Provider the prompts run against.
+        model_id (str): Model the prompts run against.
+        status (Literal["pending", "running", "done", "failed"]): Current state.
+        total (int): Number of prompts in the batch.
+        completed (int): Prompts answered successfully so far.
+        failed (int): Prompts that failed so far.
+        error (Optional[str]): Failure reason, if the job itself failed.
+        created_at (datetime): When the job was submitted.
+        finished_at (Optional[datetime]): When the job finished.
+    """
+
+    job_id: str
+    provider: str
+    model_id: str
+    status: Literal["pending", "running", "done", "failed"]
+    total: int
+    completed: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BatchResult(BaseModel):
+    """
+    The outcome of one prompt of a batch.
+
+    Attributes:
+        index (int): Position of the prompt in the submitted batch.
+        seq (int): Completion order within the job, used as the paging cursor.
+        content (Optional[str]): The model's answer, if the prompt succeeded.
+        error (Optional[str]): The failure reason, if the prompt failed.
+        tokens (int): LLM tokens used by the prompt.
+        latency (float): Seconds spent waiting for the model.
+    """
+
+    index: int
+    seq: int
+    content: Optional[str] = None
+    error: Optional[str] = None
+    tokens: int = 0
+    latency: float = 0.0
+
+
+class BatchResultPage(BaseModel):
+    """
+    A page of batch results.
+
+    Attributes:
+        results (List[BatchResult]): Results in completion order.
+        next_after (int): Cursor to pass as `after` for the next page.
+        status (str): The job's status when the page was read.
+    """
+
+    results: List[BatchResult]
+    next_after: int
+    status: str
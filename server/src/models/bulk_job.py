@@ -0,0 +1,66 @@
+"""
+bulk_job.py
+
+This module defines Pydantic models for bulk operations over a user's sessions
+and the progress documents of the background jobs that run them.
+
+Models:
+- BulkSessionRequest: Filter and action of a bulk delete/archive request.
+- BulkJob: Progress and outcome of a bulk job.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, model_validator
+
+
+class BulkSessionRequest(BaseModel):
+    """
+    A bulk operation over the current user's sessions.
+
+    At least one filter must be given; when both are, a session must match both.
+
+    Attributes:
+        action (Literal["delete", "archive", "unarchive"]): What to do with matching sessions.
+        session_ids (Optional[List[str]]): Only sessions with these IDs.
+        older_than (Optional[datetime]): Only sessions last updated before this time.
+    """
+
+    action: Literal["delete", "archive", "unarchive"]
+    session_ids: Optional[List[str]] = None
+    older_than: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def require_filter(self):
+        """
+        Reject requests that would match every session of the user.
+        """
+        if self.session_ids is None and self.older_than is None:
+            raise ValueError("Either session_ids or older_than is required")
+        return self
+
+
+class BulkJob(BaseModel):
+    """
+    Progress of a bulk operation running in the background.
+
+    Attributes:
+        job_id (str): Unique identifier of the job.
+        action (str): The bulk action being applied.
+        status (Literal["pending", "running", "done", "failed"]): Current state.
+        total (int): Sessions matching the filter when the job started.
+        processed (int): Sessions processed so far.
+        error (Optional[str]): Failure reason, if the job failed.
+        created_at (datetime): When the job was submitted.
+        finished_at (Optional[datetime]): When the job finished.
+    """
+
+    job_id: str
+    action: str
+    status: Literal["pending", "running", "done", "failed"]
+    total: int = 0
+    processed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
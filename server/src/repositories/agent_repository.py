@@ -3,38 +3,95 @@ agent_repository.py
 
 This module contains asynchronous repository functions for interacting with the
 agent session data stored in MongoDB. It handles retrieval, updates, and deletion
-of sessions and messages for authenticated users.
+of sessions and messages for authenticated users. Writes bump the version stamps
+used for conditional GETs and keep the search index in sync.
+
+Deletion is soft: a deleted session is tombstoned with "deleted_at", hidden from
+every read path, restorable during the undo window, and removed for good by the
+background purger together with its cold storage and title entries. Its search
+entries are dropped right away, so search pages never count deleted hits, and
+rebuilt on restore.
 
 Functions:
 - get_sessions_by_user: Retrieve all chat sessions belonging to a user.
 - get_session_messages: Fetch messages from a specific session with pagination.
 - rename_session_in_db: Update the name/title of a session.
-- delete_session_in_db: Remove a session belonging to a user from the database.
+- delete_session_in_db: Tombstone a session belonging to a user.
+- restore_session_in_db: Undo a delete within the undo window.
+- ensure_purge_index: Index tombstones so the purger never scans live sessions.
+- purge_deleted_sessions: Permanently remove one batch of tombstoned sessions.
+- iter_session_export: Stream a user's sessions and messages as NDJSON lines.
 """
 
+import json
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from fastapi import HTTPException
 from pymongo import ReturnDocument
 
+from ..config.config import settings
 from ..models.agent_session import AgentMessage, AgentSession
 from ..models.user import User
-from ..repositories.connection import get_agent_storage
+from ..repositories.cold_storage_repository import (
+    delete_cold_sessions,
+    ensure_hot,
+    load_cold_document,
+)
+from ..repositories.connection import (
+    SESSIONS_COLLECTION,
+    get_agent_storage,
+    get_database,
+)
+from ..repositories.search_repository import (
+    index_session_messages,
+    index_session_title,
+    remove_sessions_from_index,
+)
+from ..repositories.version_repository import bump_versions
+
+SESSION_LIST_PROJECTION = {
+    "session_id": 1,
+    "session_data": 1,
+    "agent_data": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "archived": 1,
+    "cold": 1,
+}
+EXPORT_BATCH_SIZE = 50
+NOT_DELETED = {"$exists": False}
+
+
+def _is_chat_message(message: dict) -> bool:
+    return message.get("role") in ("user", "assistant")
 
 
-async def get_sessions_by_user(user: User) -> List[AgentSession]:
+async def get_sessions_by_user(
+    user: User, archived: bool = False
+) -> List[AgentSession]:
     """
     Retrieve all chat sessions for the specified user.
 
+    Only the listing fields are read, never the session memory.
+
     Args:
         user (User): The currently authenticated user.
+        archived (bool): List archived sessions instead of active ones.
 
     Returns:
         List[AgentSession]: A list of AgentSession objects sorted by updated time.
     """
     storage = await get_agent_storage()
-    cursor = storage.collection.find({"user_id": str(user.id)}).sort("updated_at", -1)
+    query = {
+        "user_id": str(user.id),
+        "archived": True if archived else {"$ne": True},
+        "deleted_at": NOT_DELETED,
+    }
+    cursor = storage.collection.find(query, SESSION_LIST_PROJECTION).sort(
+        "updated_at", -1
+    )
     results = cursor.to_list(length=None)
     sessions = []
     for doc in results:
@@ -64,13 +121,16 @@ async def get_session_messages(
     """
     storage = await get_agent_storage()
     doc = storage.collection.find_one({"session_id": session_id})
-    if not doc:
+    if not doc or "deleted_at" in doc:
         raise HTTPException(status_code=404, detail="Session not found")
     if doc.get("user_id") != str(user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
+    if doc.get("cold"):
+        ensure_hot(session_id)
+        doc = storage.collection.find_one({"session_id": session_id}) or doc
 
     mem_msgs = doc.get("memory", {}).get("messages", [])
-    msgs = [m for m in mem_msgs if m.get("role") in ("user", "assistant")]
+    msgs = [m for m in mem_msgs if _is_chat_message(m)]
     msgs.sort(key=lambda m: m["created_at"], reverse=True)
 
     if before:
@@ -108,20 +168,26 @@ async def rename_session_in_db(
     """
     storage = await get_agent_storage()
     result = storage.collection.find_one_and_update(
-        {"session_id": session_id, "user_id": str(user.id)},
+        {"session_id": session_id, "user_id": str(user.id), "deleted_at": NOT_DELETED},
         {"$set": {"session_data.session_name": new_name}},
+        projection=SESSION_LIST_PROJECTION,
         return_document=ReturnDocument.AFTER,
     )
     if not result:
         raise HTTPException(
             status_code=404, detail="Session not found or not authorized"
         )
+    bump_versions(str(user.id))
+    index_session_title(session_id, str(user.id), new_name)
     return AgentSession(**result)
 
 
 async def delete_session_in_db(session_id: str, user: User) -> None:
     """
-    Delete a session if it belongs to the specified user.
+    Soft-delete a session if it belongs to the specified user.
+
+    The session is only tombstoned and dropped from the search index here; the
+    purger removes it once the undo window has passed.
 
     Args:
         session_id (str): The ID of the session to delete.
@@ -131,10 +197,129 @@ async def delete_session_in_db(session_id: str, user: User) -> None:
         HTTPException: If the session is not found or user is unauthorized.
     """
     storage = await get_agent_storage()
-    res = storage.collection.delete_one(
-        {"session_id": session_id, "user_id": str(user.id)}
+    res = storage.collection.update_one(
+        {"session_id": session_id, "user_id": str(user.id), "deleted_at": NOT_DELETED},
+        {"$set": {"deleted_at": int(time.time())}},
     )
-    if res.deleted_count == 0:
+    if res.matched_count == 0:
         raise HTTPException(
             status_code=404, detail="Session not found or not authorized"
         )
+    remove_sessions_from_index([session_id])
+    bump_versions(str(user.id), session_id)
+
+
+async def restore_session_in_db(session_id: str, user: User) -> AgentSession:
+    """
+    Restore a deleted session if the undo window has not passed yet.
+
+    The session's search entries are rebuilt; a cold session is hydrated first
+    so its messages can be indexed.
+
+    Args:
+        session_id (str): The ID of the session to restore.
+        user (User): The currently authenticated user.
+
+    Raises:
+        HTTPException: If no restorable session is found for the user.
+
+    Returns:
+        AgentSession: The restored session.
+    """
+    storage = await get_agent_storage()
+    result = storage.collection.find_one_and_update(
+        {
+            "session_id": session_id,
+            "user_id": str(user.id),
+            "deleted_at": {
+                "$gte": int(time.time() - settings.session_undo_window_seconds)
+            },
+        },
+        {"$unset": {"deleted_at": ""}},
+        projection=SESSION_LIST_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if not result:
+        raise HTTPException(
+            status_code=404, detail="Session not found or no longer restorable"
+        )
+    if result.get("cold"):
+        ensure_hot(session_id)
+    index_session_messages(session_id, str(user.id))
+    bump_versions(str(user.id), session_id)
+    return AgentSession(**result)
+
+
+def ensure_purge_index() -> None:
+    """
+    Create a sparse index on "deleted_at" so purge queries only touch tombstones.
+    """
+    get_database()[SESSIONS_COLLECTION].create_index("deleted_at", sparse=True)
+
+
+def purge_deleted_sessions(undo_window_seconds: float, batch_size: int) -> int:
+    """
+    Permanently delete one batch of sessions tombstoned before the undo window.
+
+    Args:
+        undo_window_seconds (float): How long deleted sessions stay restorable.
+        batch_size (int): Maximum number of sessions to purge.
+
+    Returns:
+        int: The number of sessions purged.
+    """
+    sessions = get_database()[SESSIONS_COLLECTION]
+    expired = {"deleted_at": {"$lt": int(time.time() - undo_window_seconds)}}
+    ids = [
+        d["session_id"]
+        for d in sessions.find(expired, {"session_id": 1}).limit(batch_size)
+    ]
+    if not ids:
+        return 0
+    sessions.delete_many({**expired, "session_id": {"$in": ids}})
+    remove_sessions_from_index(ids)
+    delete_cold_sessions(ids)
+    return len(ids)
+
+
+def iter_session_export(user: User) -> Iterator[str]:
+    """
+    Yield a user's sessions, with their user and assistant messages, as NDJSON lines.
+
+    Sessions are read through a server-side cursor in small batches, so memory use
+    stays bounded by a single batch regardless of how many sessions the user has.
+
+    Args:
+        user (User): The currently authenticated user.
+
+    Yields:
+        str: One JSON-encoded session per line.
+    """
+    cursor = (
+        get_database()[SESSIONS_COLLECTION]
+        .find(
+            {"user_id": str(user.id), "deleted_at": NOT_DELETED},
+            {**SESSION_LIST_PROJECTION, "_id": 0, "memory.messages": 1},
+            batch_size=EXPORT_BATCH_SIZE,
+        )
+        .sort("created_at", 1)
+    )
+    try:
+        for doc in cursor:
+            memory = doc.pop("memory", {})
+            if doc.pop("cold", False):
+                memory = (load_cold_document(doc["session_id"]) or {}).get("memory", {})
+            messages = memory.get("messages", [])
+            doc["title"] = doc.get("session_data", {}).get("session_name")
+            doc["messages"] = [
+                {
+                    "role": m["role"],
+                    "content": m.get("content"),
+                    "created_at": m.get("created_at"),
+                }
+                for m in messages
+                if _is_chat_message(m)
+            ]
+            yield json.dumps(doc, default=str) + "\n"
+    finally:
+        cursor.close()
@@ -0,0 +1,252 @@
+"""
+batch_repository.py
+
+This module stores batch prompt jobs and their results. Jobs live in the
+"batch_jobs" collection and act as a work queue: workers claim a pending job
+atomically and keep a heartbeat on it, so a job whose worker died is picked up
+again once its lease expires. Each claim stores a fresh owner token, and every
+write made under the lease checks it, so a worker whose lease was taken over
+stops instead of writing next to the new owner. Results are written to
+"batch_results" in bulk, one document per prompt, keyed by job and prompt index
+so rewrites are no-ops.
+
+Functions:
+- ensure_batch_indexes: Create the queue and result indexes.
+- create_batch_job: Record a pending job for a batch request.
+- claim_batch_job: Atomically take the oldest runnable job.
+- get_finished_prompts: Indexes and last sequence number of a job's results.
+- record_batch_results: Bulk-write results and update the job's counters.
+- finish_batch_job: Mark a job as done or failed.
+- release_batch_job: Put an unfinished job back in the queue.
+- get_batch_job: Retrieve a job's progress for its owner.
+- get_batch_results: Read a job's results after a sequence number.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Set, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from ..models.batch_job import BatchJob, BatchPromptRequest, BatchResult
+from ..models.user import User
+from ..repositories.connection import get_database
+
+JOBS_COLLECTION = "batch_jobs"
+RESULTS_COLLECTION = "batch_results"
+RESULT_FIELDS = ("index", "seq", "content", "error", "tokens", "latency")
+
+
+def _to_job(doc: dict) -> BatchJob:
+    return BatchJob(job_id=doc["_id"], **doc)
+
+
+def ensure_batch_indexes() -> None:
+    """
+    Index jobs by queue state and results by job and completion order.
+    """
+    db = get_database()
+    db[JOBS_COLLECTION].create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+    db[RESULTS_COLLECTION].create_index([("job_id", ASCENDING), ("seq", ASCENDING)])
+
+
+async def create_batch_job(user: User, request: BatchPromptRequest) -> BatchJob:
+    """
+    Record a pending batch job.
+
+    Args:
+        user (User): The currently authenticated user.
+        request (BatchPromptRequest): The model and prompts to run.
+
+    Returns:
+        BatchJob: The newly created job.
+    """
+    doc = {
+        "_id": uuid4().hex,
+        "user_id": str(user.id),
+        "provider": request.provider.lower(),
+        "model_id": request.model_id,
+        "prompts": request.prompts,
+        "status": "pending",
+        "total": len(request.prompts),
+        "completed": 0,
+        "failed": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+    get_database()[JOBS_COLLECTION].insert_one(doc)
+    return _to_job(doc)
+
+
+def claim_batch_job(lease_seconds: float) -> Optional[dict]:
+    """
+    Take the oldest pending job, or a running job whose heartbeat has expired.
+
+    Args:
+        lease_seconds (float): Heartbeat age after which a running job is orphaned.
+
+    Returns:
+        Optional[dict]: The claimed job document, including its prompts and the
+        "owner" token to pass to every later write, or None.
+    """
+    now = time.time()
+    return get_database()[JOBS_COLLECTION].find_one_and_update(
+        {
+            "$or": [
+                {"status": "pending"},
+                {"status": "running", "heartbeat_at": {"$lt": now - lease_seconds}},
+            ]
+        },
+        {"$set": {"status": "running", "heartbeat_at": now, "owner": uuid4().hex}},
+        sort=[("created_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def get_finished_prompts(job_id: str) -> Tuple[Set[int], int]:
+    """
+    Find which prompts of a job already have a result.
+
+    Args:
+        job_id (str): The job ID.
+
+    Returns:
+        Tuple[Set[int], int]: The finished prompt indexes and the highest
+        sequence number written so far.
+    """
+    indexes, last_seq = set(), 0
+    for doc in get_database()[RESULTS_COLLECTION].find(
+        {"job_id": job_id}, {"index": 1, "seq": 1}
+    ):
+        indexes.add(doc["index"])
+        last_seq = max(last_seq, doc["seq"])
+    return indexes, last_seq
+
+
+def _lease(job_id: str, owner: Optional[str]) -> dict:
+    return {"_id": job_id} if owner is None else {"_id": job_id, "owner": owner}
+
+
+def record_batch_results(
+    job_id: str, results: List[dict], owner: Optional[str] = None
+) -> bool:
+    """
+    Refresh the job's heartbeat and write a buffer of results with one bulk write.
+
+    Results must be in sequence order. Counters only count results that were
+    actually inserted, so replaying a buffer after a retry does not inflate them.
+    Nothing is written if the lease was taken over by another worker.
+
+    Args:
+        job_id (str): The job the results belong to.
+        results (List[dict]): Result documents with the BatchResult fields; may
+            be empty to only refresh the heartbeat.
+        owner (Optional[str]): The owner token from the claim; None skips the check.
+
+    Returns:
+        bool: False if the job is no longer owned by the caller.
+    """
+    db = get_database()
+    heartbeat = db[JOBS_COLLECTION].update_one(
+        _lease(job_id, owner), {"$set": {"heartbeat_at": time.time()}}
+    )
+    if not heartbeat.matched_count:
+        return False
+    inc = {"completed": 0, "failed": 0}
+    if results:
+        ops = [
+            UpdateOne(
+                {"_id": f"{job_id}:{r['index']}"},
+                {
+                    "$setOnInsert": {
+                        "job_id": job_id,
+                        **{k: r.get(k) for k in RESULT_FIELDS},
+                    }
+                },
+                upsert=True,
+            )
+            for r in results
+        ]
+        # Ordered, so readers paging by seq only ever see a gap-free prefix.
+        written = db[RESULTS_COLLECTION].bulk_write(ops, ordered=True)
+        for position in written.upserted_ids:
+            inc["failed" if results[position].get("error") else "completed"] += 1
+        db[JOBS_COLLECTION].update_one({"_id": job_id}, {"$inc": inc})
+    return True
+
+
+def finish_batch_job(
+    job_id: str, error: Optional[str] = None, owner: Optional[str] = None
+) -> None:
+    """
+    Mark a job as done, or as failed if an error is given.
+
+    Args:
+        job_id (str): The job ID.
+        error (Optional[str]): Why the job could not be completed.
+        owner (Optional[str]): The owner token from the claim; None skips the check.
+    """
+    update = {
+        "status": "failed" if error else "done",
+        "finished_at": datetime.now(timezone.utc),
+    }
+    if error:
+        update["error"] = error
+    get_database()[JOBS_COLLECTION].update_one(_lease(job_id, owner), {"$set": update})
+
+
+def release_batch_job(job_id: str, owner: Optional[str] = None) -> None:
+    """
+    Put a running job back in the queue so another worker can resume it.
+
+    Args:
+        job_id (str): The job ID.
+        owner (Optional[str]): The owner token from the claim; None skips the check.
+    """
+    get_database()[JOBS_COLLECTION].update_one(
+        {**_lease(job_id, owner), "status": "running"}, {"$set": {"status": "pending"}}
+    )
+
+
+async def get_batch_job(job_id: str, user: User) -> BatchJob:
+    """
+    Retrieve the progress of a batch job owned by the user.
+
+    Args:
+        job_id (str): The job ID.
+        user (User): The currently authenticated user.
+
+    Raises:
+        HTTPException: If the job is not found or not owned by the user.
+
+    Returns:
+        BatchJob: The job's current progress.
+    """
+    doc = get_database()[JOBS_COLLECTION].find_one(
+        {"_id": job_id, "user_id": str(user.id)}, {"prompts": 0}
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Job not found or not authorized")
+    return _to_job(doc)
+
+
+def get_batch_results(job_id: str, after: int, limit: int) -> List[BatchResult]:
+    """
+    Read a job's results in completion order.
+
+    Args:
+        job_id (str): The job ID; ownership must already be checked.
+        after (int): Only results with a higher sequence number are returned.
+        limit (int): Maximum number of results.
+
+    Returns:
+        List[BatchResult]: The results, ordered by sequence number.
+    """
+    cursor = (
+        get_database()[RESULTS_COLLECTION]
+        .find({"job_id": job_id, "seq": {"$gt": after}}, {"_id": 0, "job_id": 0})
+        .sort("seq", ASCENDING)
+        .limit(limit)
+    )
+    return [BatchResult(**doc) for doc in cursor]
@@ -0,0 +1,212 @@
+"""
+bulk_repository.py
+
+This module runs bulk operations over a user's sessions as background jobs.
+Matching sessions are processed in batches with update_many (deletes tombstone
+sessions for the purger and drop their search entries, like single deletes do),
+and the progress of each job is recorded in the "bulk_jobs" collection for
+polling. Jobs store their request and heartbeat after every batch, so a job
+whose runner died with the server is resumed once its heartbeat goes stale;
+bulk actions are idempotent, so resuming simply picks up the sessions that
+still match.
+
+Functions:
+- create_bulk_job: Record a new job for a bulk request.
+- run_bulk_job: Apply the bulk action batch by batch (blocking, run in background).
+- resume_stale_bulk_jobs: Resume jobs whose runner stopped heartbeating.
+- get_bulk_job: Retrieve a job's progress for its owner.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from pymongo import ASCENDING
+
+from ..models.bulk_job import BulkJob, BulkSessionRequest
+from ..models.user import User
+from ..repositories.connection import SESSIONS_COLLECTION, get_database
+from ..repositories.search_repository import remove_sessions_from_index
+from ..repositories.version_repository import bump_session_versions, bump_versions
+
+JOBS_COLLECTION = "bulk_jobs"
+BULK_BATCH_SIZE = 500
+BULK_JOB_LEASE_SECONDS = 60.0
+
+
+def _session_filter(user_id: str, request: BulkSessionRequest) -> dict:
+    query = {"user_id": user_id, "deleted_at": {"$exists": False}}
+    if request.session_ids is not None:
+        query["session_id"] = {"$in": request.session_ids}
+    if request.older_than is not None:
+        older_than = request.older_than
+        if older_than.tzinfo is None:
+            older_than = older_than.replace(tzinfo=timezone.utc)
+        query["updated_at"] = {"$lt": int(older_than.timestamp())}
+    if request.action == "archive":
+        query["archived"] = {"$ne": True}
+    elif request.action == "unarchive":
+        query["archived"] = True
+    return query
+
+
+def _to_job(doc: dict) -> BulkJob:
+    return BulkJob(job_id=doc["_id"], **doc)
+
+
+def _finish(job_id: str, error: Optional[str] = None) -> None:
+    update = {
+        "status": "failed" if error else "done",
+        "finished_at": datetime.now(timezone.utc),
+    }
+    if error:
+        update["error"] = error
+    get_database()[JOBS_COLLECTION].update_one({"_id": job_id}, {"$set": update})
+
+
+async def create_bulk_job(user: User, request: BulkSessionRequest) -> BulkJob:
+    """
+    Record a pending bulk job and count the sessions it will touch.
+
+    Args:
+        user (User): The currently authenticated user.
+        request (BulkSessionRequest): The bulk action and its filter.
+
+    Returns:
+        BulkJob: The newly created job.
+    """
+    db = get_database()
+    total = db[SESSIONS_COLLECTION].count_documents(
+        _session_filter(str(user.id), request)
+    )
+    doc = {
+        "_id": uuid4().hex,
+        "user_id": str(user.id),
+        "action": request.action,
+        "request": request.model_dump(),
+        "status": "pending",
+        "total": total,
+        "processed": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+    db[JOBS_COLLECTION].insert_one(doc)
+    return _to_job(doc)
+
+
+def run_bulk_job(job_id: str, user_id: str, request: BulkSessionRequest) -> None:
+    """
+    Apply a bulk action batch by batch, recording progress after each batch.
+
+    Processed sessions no longer match the filter, so each batch is simply the
+    next BULK_BATCH_SIZE matching sessions.
+
+    Args:
+        job_id (str): The job to report progress on.
+        user_id (str): Owner of the sessions.
+        request (BulkSessionRequest): The bulk action and its filter.
+    """
+    db = get_database()
+    sessions = db[SESSIONS_COLLECTION]
+    jobs = db[JOBS_COLLECTION]
+    query = _session_filter(user_id, request)
+    jobs.update_one(
+        {"_id": job_id}, {"$set": {"status": "running", "heartbeat_at": time.time()}}
+    )
+    try:
+        while True:
+            ids = [
+                d["session_id"]
+                for d in sessions.find(query, {"session_id": 1}).limit(BULK_BATCH_SIZE)
+            ]
+            if not ids:
+                break
+            scoped = {"user_id": user_id, "session_id": {"$in": ids}}
+            if request.action == "delete":
+                sessions.update_many(scoped, {"$set": {"deleted_at": int(time.time())}})
+                remove_sessions_from_index(ids)
+                bump_session_versions(user_id, ids)
+            else:
+                sessions.update_many(
+                    scoped, {"$set": {"archived": request.action == "archive"}}
+                )
+                bump_versions(user_id)
+            jobs.update_one(
+                {"_id": job_id},
+                {
+                    "$inc": {"processed": len(ids)},
+                    "$set": {"heartbeat_at": time.time()},
+                },
+            )
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        _finish(job_id, str(exc))
+        return
+    _finish(job_id)
+
+
+def resume_stale_bulk_jobs(lease_seconds: float = BULK_JOB_LEASE_SECONDS) -> int:
+    """
+    Resume unfinished jobs whose runner stopped, typically in a restart or deploy.
+
+    A job is stale when its last heartbeat, or its creation if it never started,
+    is older than the lease. Each stale job is claimed atomically by refreshing
+    its heartbeat and then run to completion in the calling thread. Jobs recorded
+    before requests were stored cannot be resumed and are marked failed.
+
+    Args:
+        lease_seconds (float): Heartbeat age after which a job's runner is dead.
+
+    Returns:
+        int: The number of jobs resumed or failed.
+    """
+    jobs = get_database()[JOBS_COLLECTION]
+    count = 0
+    while True:
+        now = time.time()
+        job = jobs.find_one_and_update(
+            {
+                "status": {"$in": ["pending", "running"]},
+                "$or": [
+                    {"heartbeat_at": {"$lt": now - lease_seconds}},
+                    {
+                        "heartbeat_at": {"$exists": False},
+                        "created_at": {
+                            "$lt": datetime.now(timezone.utc)
+                            - timedelta(seconds=lease_seconds)
+                        },
+                    },
+                ],
+            },
+            {"$set": {"status": "running", "heartbeat_at": now}},
+            sort=[("created_at", ASCENDING)],
+        )
+        if not job:
+            return count
+        count += 1
+        if "request" not in job:
+            _finish(job["_id"], "Interrupted by a server restart")
+            continue
+        run_bulk_job(job["_id"], job["user_id"], BulkSessionRequest(**job["request"]))
+
+
+async def get_bulk_job(job_id: str, user: User) -> BulkJob:
+    """
+    Retrieve the progress of a bulk job owned by the user.
+
+    Args:
+        job_id (str): The job ID.
+        user (User): The currently authenticated user.
+
+    Raises:
+        HTTPException: If the job is not found or not owned by the user.
+
+    Returns:
+        BulkJob: The job's current progress.
+    """
+    doc = get_database()[JOBS_COLLECTION].find_one(
+        {"_id": job_id, "user_id": str(user.id)}
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Job not found or not authorized")
+    return _to_job(doc)
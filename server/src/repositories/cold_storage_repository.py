@@ -0,0 +1,210 @@
+"""
+cold_storage_repository.py
+
+This module moves idle sessions out of the working set. A cold session's full
+document is compressed into a blob in the "cold_sessions" collection, and the
+document in "sessions" is replaced by a small stub that still carries the fields
+needed to list it. Cold sessions are hydrated back on demand, and every hydration
+check stamps "last_accessed" so a session in use is never picked as idle.
+
+Blobs are BSON compressed with zstd when the optional `zstandard` package is
+installed, and with zlib otherwise; the codec is stored with each blob.
+
+Functions:
+- ensure_cold_storage_indexes: Index sessions by last update for the archiver.
+- freeze_idle_sessions: Move one batch of idle sessions to cold storage.
+- ensure_hot: Mark a session as accessed and hydrate it if it is cold.
+- load_cold_document: Decode a cold session without hydrating it.
+- delete_cold_sessions: Drop the cold blobs of deleted sessions.
+"""
+
+import time
+import zlib
+from typing import Iterable, Optional
+
+import bson
+from bson.binary import Binary
+from pymongo import ReturnDocument
+
+from ..repositories.connection import SESSIONS_COLLECTION, get_database
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COLD_COLLECTION = "cold_sessions"
+STUB_FIELDS = (
+    "session_id",
+    "user_id",
+    "session_data",
+    "agent_data",
+    "created_at",
+    "updated_at",
+    "archived",
+    "search_indexed",
+    "deleted_at",
+    "last_accessed",
+)
+
+
+def _compress(data: bytes) -> tuple:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this cold session")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def _unchanged_filter(doc: dict) -> dict:
+    # agno bumps updated_at on every write to the session memory; renames,
+    # archiving, index markers and access stamps only touch stub fields.
+    query = {"_id": doc["_id"], "cold": {"$ne": True}}
+    for key in STUB_FIELDS:
+        query[key] = doc[key] if key in doc else {"$exists": False}
+    return query
+
+
+def _freeze(doc: dict) -> bool:
+    db = get_database()
+    codec, blob = _compress(bson.encode(doc))
+    db[COLD_COLLECTION].replace_one(
+        {"_id": doc["session_id"]},
+        {
+            "_id": doc["session_id"],
+            "user_id": doc.get("user_id"),
+            "codec": codec,
+            "blob": Binary(blob),
+            "frozen_at": int(time.time()),
+        },
+        upsert=True,
+    )
+    stub = {k: doc[k] for k in STUB_FIELDS if k in doc}
+    stub["cold"] = True
+    try:
+        # Only swap in the stub if the document is unchanged since it was read.
+        modified = (
+            db[SESSIONS_COLLECTION]
+            .replace_one(_unchanged_filter(doc), {"_id": doc["_id"], **stub})
+            .modified_count
+        )
+    except Exception:
+        db[COLD_COLLECTION].delete_one({"_id": doc["session_id"]})
+        raise
+    if not modified:
+        db[COLD_COLLECTION].delete_one({"_id": doc["session_id"]})
+    return bool(modified)
+
+
+def ensure_cold_storage_indexes() -> None:
+    """
+    Index sessions by last update so the archiver can find idle ones cheaply.
+    """
+    get_database()[SESSIONS_COLLECTION].create_index("updated_at")
+
+
+def freeze_idle_sessions(max_idle_seconds: float, batch_size: int) -> int:
+    """
+    Move one batch of sessions idle for longer than the cutoff to cold storage.
+
+    A session is idle when it was neither updated nor accessed for the cutoff.
+    A session that fails to freeze keeps its hot document and is skipped.
+
+    Args:
+        max_idle_seconds (float): Sessions not updated or accessed for this long are frozen.
+        batch_size (int): Maximum number of sessions to freeze.
+
+    Returns:
+        int: The number of sessions frozen.
+    """
+    cutoff = int(time.time() - max_idle_seconds)
+    cursor = get_database()[SESSIONS_COLLECTION].find(
+        {
+            "updated_at": {"$lt": cutoff},
+            "cold": {"$ne": True},
+            "deleted_at": {"$exists": False},
+            "$or": [
+                {"last_accessed": {"$exists": False}},
+                {"last_accessed": {"$lt": cutoff}},
+            ],
+        },
+        limit=batch_size,
+        batch_size=batch_size,
+    )
+    frozen = 0
+    for doc in cursor:
+        try:
+            frozen += _freeze(doc)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Failed to freeze session {doc.get('session_id')}: {exc}")
+    return frozen
+
+
+def load_cold_document(session_id: str) -> Optional[dict]:
+    """
+    Decode the full document of a cold session without hydrating it.
+
+    Args:
+        session_id (str): The session ID.
+
+    Returns:
+        Optional[dict]: The session document as it was when frozen, or None.
+    """
+    cold = get_database()[COLD_COLLECTION].find_one({"_id": session_id})
+    if not cold:
+        return None
+    return bson.decode(_decompress(cold["codec"], cold["blob"]))
+
+
+def ensure_hot(session_id: str) -> None:
+    """
+    Hydrate a session back into the "sessions" collection if it is cold.
+
+    The session's "last_accessed" is stamped first, whether it is cold or not,
+    so the archiver cannot freeze it again while the caller is reading it. Stub
+    fields changed while the session was cold (title, archive flag) win over
+    the frozen copy. If the stub was already overwritten with a full document,
+    the cold flag and blob are simply dropped.
+
+    Args:
+        session_id (str): The session ID.
+    """
+    db = get_database()
+    sessions = db[SESSIONS_COLLECTION]
+    stub = sessions.find_one_and_update(
+        {"session_id": session_id},
+        {"$set": {"last_accessed": int(time.time())}},
+        projection={**{k: 1 for k in STUB_FIELDS}, "cold": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not stub or not stub.pop("cold", False):
+        return
+    full = load_cold_document(session_id)
+    hydrated = 0
+    if full is not None:
+        full.update({k: v for k, v in stub.items() if k != "_id"})
+        hydrated = sessions.replace_one(
+            {"_id": stub["_id"], "cold": True, "memory": {"$exists": False}},
+            {**full, "_id": stub["_id"]},
+        ).modified_count
+    if not hydrated:
+        sessions.update_one({"_id": stub["_id"]}, {"$unset": {"cold": ""}})
+    db[COLD_COLLECTION].delete_one({"_id": session_id})
+
+
+def delete_cold_sessions(session_ids: Iterable[str]) -> None:
+    """
+    Drop the cold blobs of deleted sessions.
+
+    Args:
+        session_ids (Iterable[str]): The deleted sessions.
+    """
+    ids = list(session_ids)
+    if ids:
+        get_database()[COLD_COLLECTION].delete_many({"_id": {"$in": ids}})
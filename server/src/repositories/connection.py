@@ -1,44 +1,86 @@
 """
 This module sets up the connection to MongoDB and initializes the Beanie ODM.
-It also provides a helper function to get the MongoDbStorage for Agno agents.
+It also provides a helper function to get the MongoDbStorage for Agno agents
+and a shared synchronous database handle for auxiliary collections, both backed
+by a single MongoClient, and closes every client on shutdown.
 """
 
+from typing import Optional
+
 from agno.storage.mongodb import MongoDbStorage
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.database import Database
 
 from ..config.config import settings
 from ..models.user import User
 
 DEFAULT_DB_NAME = "MAIServant"
+SESSIONS_COLLECTION = "sessions"
+
+_sync_client: Optional[MongoClient] = None
+_async_client: Optional[AsyncIOMotorClient] = None
 
 
 async def init_db():
     """
     Initialize the MongoDB connection and Beanie ODM using configuration from config.py.
     """
+    global _async_client  # pylint: disable=global-statement
     mongodb_uri = settings.database_url
-    client = AsyncIOMotorClient(mongodb_uri)
-    db = client[DEFAULT_DB_NAME]
+    _async_client = AsyncIOMotorClient(mongodb_uri)
+    db = _async_client[DEFAULT_DB_NAME]
     await init_beanie(database=db, document_models=[User])
 
 
+def _get_sync_client() -> MongoClient:
+    global _sync_client  # pylint: disable=global-statement
+    if _sync_client is None:
+        _sync_client = MongoClient(settings.database_url)
+    return _sync_client
+
+
+def close_db() -> None:
+    """
+    Close the Beanie and shared synchronous MongoDB clients.
+    """
+    global _sync_client, _async_client  # pylint: disable=global-statement
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
 async def get_agent_storage():
     """
     Asynchronously returns a MongoDbStorage instance configured for Agno agents.
 
     Storage configuration:
       - collection_name: "sessions"
-      - db_url: fetched from settings.database_url
+      - client: the shared MongoClient for settings.database_url
       - db_name: "MAIServant"
 
     Returns:
         MongoDbStorage: The configured storage backend.
     """
-    mongodb_uri = settings.database_url
     storage = MongoDbStorage(
-        collection_name="sessions",
-        db_url=mongodb_uri,
+        collection_name=SESSIONS_COLLECTION,
+        client=_get_sync_client(),
         db_name=DEFAULT_DB_NAME,
     )
     return storage
+
+
+def get_database() -> Database:
+    """
+    Return the synchronous MongoDB database shared by auxiliary collections.
+
+    The underlying MongoClient is created on first use and reused afterwards.
+
+    Returns:
+        Database: The "MAIServant" database.
+    """
+    return _get_sync_client()[DEFAULT_DB_NAME]
@@ -0,0 +1,285 @@
+"""
+search_repository.py
+
+This module maintains and queries the full-text search index over a user's
+conversations. The index lives in the "search_index" collection with one
+document per session title and per user/assistant message, and a compound
+(user_id, text) index so every query is confined to a single user's entries.
+
+The index is updated incrementally: after each persisted run only the messages
+created by that run are upserted, and title changes rewrite a single document.
+
+Functions:
+- ensure_search_indexes: Create the collection indexes.
+- index_session_messages: Upsert a session's messages into the index.
+- index_session_title: Upsert a session's title into the index.
+- remove_sessions_from_index: Drop the index entries of sessions.
+- backfill_search_index: Index sessions that predate the search index.
+- search_sessions: Ranked, paginated search with highlighted snippets.
+"""
+
+import re
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, TEXT, UpdateOne
+
+from ..models.agent_session import SearchHit, SearchResults
+from ..repositories.connection import SESSIONS_COLLECTION, get_database
+
+SEARCH_COLLECTION = "search_index"
+SNIPPET_RADIUS = 80
+
+
+def _collection():
+    return get_database()[SEARCH_COLLECTION]
+
+
+def ensure_search_indexes() -> None:
+    """
+    Create the text and lookup indexes of the search collection.
+    """
+    collection = _collection()
+    collection.create_index(
+        [("user_id", ASCENDING), ("content", TEXT)],
+        name="user_content_text",
+    )
+    collection.create_index("session_id")
+
+
+def index_session_messages(
+    session_id: str,
+    user_id: str,
+    since: Optional[int] = None,
+    doc: Optional[dict] = None,
+) -> int:
+    """
+    Upsert a session's user and assistant messages into the search index.
+
+    Message entries are keyed by their position in the session's memory, so
+    re-indexing a message is idempotent. The session is marked as indexed so the
+    backfill skips it.
+
+    Args:
+        session_id (str): The session to index.
+        user_id (str): Owner of the session.
+        since (Optional[int]): Only index messages created at or after this epoch
+            second; None indexes every message.
+        doc (Optional[dict]): The session document, if already loaded.
+
+    Returns:
+        int: The number of entries written.
+    """
+    sessions = get_database()[SESSIONS_COLLECTION]
+    if doc is None:
+        doc = sessions.find_one(
+            {"session_id": session_id},
+            {"memory.messages": 1, "session_data.session_name": 1, "search_indexed": 1},
+        )
+    if not doc:
+        return 0
+
+    ops = []
+    messages = doc.get("memory", {}).get("messages", [])
+    for position, message in enumerate(messages):
+        content = message.get("content")
+        if (
+            message.get("role") not in ("user", "assistant")
+            or message.get("from_history")
+            or not isinstance(content, str)
+            or not content.strip()
+        ):
+            continue
+        created_at = message.get("created_at") or 0
+        if since is not None and created_at < since:
+            continue
+        ops.append(
+            UpdateOne(
+                {"_id": f"{session_id}:{position}"},
+                {
+                    "$set": {
+                        "session_id": session_id,
+                        "user_id": user_id,
+                        "role": message["role"],
+                        "content": content,
+                        "created_at": created_at,
+                    }
+                },
+                upsert=True,
+            )
+        )
+
+    title = doc.get("session_data", {}).get("session_name")
+    if since is None and title:
+        index_session_title(session_id, user_id, title)
+    if ops:
+        _collection().bulk_write(ops, ordered=False)
+    if "search_indexed" not in doc:
+        sessions.update_one(
+            {"session_id": session_id, "search_indexed": {"$exists": False}},
+            {"$set": {"search_indexed": True}},
+        )
+    return len(ops)
+
+
+def index_session_title(session_id: str, user_id: str, title: str) -> None:
+    """
+    Upsert a session's title into the search index.
+
+    Args:
+        session_id (str): The session whose title changed.
+        user_id (str): Owner of the session.
+        title (str): The new title.
+    """
+    _collection().update_one(
+        {"_id": f"{session_id}:title"},
+        {
+            "$set": {
+                "session_id": session_id,
+                "user_id": user_id,
+                "role": "title",
+                "content": title,
+                "created_at": int(time.time()),
+            }
+        },
+        upsert=True,
+    )
+
+
+def remove_sessions_from_index(session_ids: Iterable[str]) -> None:
+    """
+    Remove every search entry belonging to the given sessions.
+
+    Args:
+        session_ids (Iterable[str]): The sessions to drop from the index.
+    """
+    ids = list(session_ids)
+    if ids:
+        _collection().delete_many({"session_id": {"$in": ids}})
+
+
+def backfill_search_index(batch_size: int = 200) -> int:
+    """
+    Index sessions that were persisted before the search index existed.
+
+    Sessions are marked with "search_indexed" once processed, so the backfill
+    can be interrupted and resumed.
+
+    Args:
+        batch_size (int): Number of sessions read per cursor batch.
+
+    Returns:
+        int: The number of sessions indexed.
+    """
+    sessions = get_database()[SESSIONS_COLLECTION]
+    cursor = sessions.find(
+        {
+            "search_indexed": {"$exists": False},
+            "cold": {"$ne": True},
+            "deleted_at": {"$exists": False},
+        },
+        {"session_id": 1, "user_id": 1, "memory.messages": 1, "session_data": 1},
+        batch_size=batch_size,
+    )
+    count = 0
+    for doc in cursor:
+        if doc.get("user_id"):
+            index_session_messages(doc["session_id"], doc["user_id"], doc=doc)
+        else:
+            sessions.update_one({"_id": doc["_id"]}, {"$set": {"search_indexed": True}})
+        count += 1
+    return count
+
+
+def _query_terms(query: str) -> List[str]:
+    terms = re.findall(r"\w+", re.sub(r"(^|\s)-\S+", " ", query))
+    return sorted({t.lower() for t in terms}, key=len, reverse=True)
+
+
+def make_snippet(content: str, terms: List[str]) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Cut a snippet of a message around its first query match.
+
+    Args:
+        content (str): The full message text.
+        terms (List[str]): Lower-cased query terms.
+
+    Returns:
+        Tuple[str, List[Tuple[int, int]]]: The snippet and the [start, end)
+        offsets of every term occurrence within it.
+    """
+    if not terms:
+        return content[: 2 * SNIPPET_RADIUS], []
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    first = pattern.search(content)
+    center = first.start() if first else 0
+    start = max(0, center - SNIPPET_RADIUS)
+    end = min(len(content), center + SNIPPET_RADIUS)
+    snippet = content[start:end]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    highlights = [
+        (m.start() + len(prefix), m.end() + len(prefix))
+        for m in pattern.finditer(snippet)
+    ]
+    return prefix + snippet + suffix, highlights
+
+
+async def search_sessions(
+    user_id: str, query: str, page: int, limit: int
+) -> SearchResults:
+    """
+    Search a user's session titles and messages.
+
+    Args:
+        user_id (str): The user whose conversations are searched.
+        query (str): MongoDB $text search expression.
+        page (int): Zero-based page number.
+        limit (int): Hits per page.
+
+    Returns:
+        SearchResults: Hits ranked by text score, with snippets and highlights.
+    """
+    cursor = (
+        _collection()
+        .find(
+            {"user_id": user_id, "$text": {"$search": query}},
+            {"score": {"$meta": "textScore"}, "user_id": 0},
+        )
+        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)])
+        .skip(page * limit)
+        .limit(limit + 1)
+    )
+    docs = cursor.to_list(length=None)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    titles = {
+        d["session_id"]: d.get("session_data", {}).get("session_name")
+        for d in get_database()[SESSIONS_COLLECTION].find(
+            {
+                "session_id": {"$in": list({d["session_id"] for d in docs})},
+                "deleted_at": {"$exists": False},
+            },
+            {"session_id": 1, "session_data.session_name": 1},
+        )
+    }
+
+    terms = _query_terms(query)
+    hits = []
+    for doc in docs:
+        if doc["session_id"] not in titles:
+            continue
+        snippet, highlights = make_snippet(doc["content"], terms)
+        hits.append(
+            SearchHit(
+                session_id=doc["session_id"],
+                title=titles[doc["session_id"]],
+                role=doc["role"],
+                snippet=snippet,
+                highlights=highlights,
+                score=doc["score"],
+                created_at=doc["created_at"],
+            )
+        )
+    return SearchResults(hits=hits, page=page, limit=limit, has_more=has_more)
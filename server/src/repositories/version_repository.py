@@ -0,0 +1,88 @@
+"""
+version_repository.py
+
+This module keeps cheap version stamps for a user's session list and for the
+messages of individual sessions. Stamps are small counters in the
+"session_versions" collection that are bumped whenever the underlying data
+changes, so HTTP handlers can build ETags without reading session documents.
+
+Functions:
+- get_user_version: Current stamp of a user's session list.
+- get_session_version: Current stamp of a session's messages.
+- bump_versions: Increment the stamps affected by a change.
+- bump_session_versions: Increment the stamps of many sessions at once.
+"""
+
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+from ..repositories.connection import get_database
+
+VERSIONS_COLLECTION = "session_versions"
+
+
+def _get(key: str) -> int:
+    doc = get_database()[VERSIONS_COLLECTION].find_one({"_id": key}, {"v": 1})
+    return doc["v"] if doc else 0
+
+
+def get_user_version(user_id: str) -> int:
+    """
+    Return the version stamp of a user's session list.
+
+    Args:
+        user_id (str): The owner of the sessions.
+
+    Returns:
+        int: The current stamp, 0 if the list never changed.
+    """
+    return _get(f"user:{user_id}")
+
+
+def get_session_version(session_id: str) -> int:
+    """
+    Return the version stamp of a session's messages.
+
+    Args:
+        session_id (str): The session ID.
+
+    Returns:
+        int: The current stamp, 0 if the session never changed.
+    """
+    return _get(f"session:{session_id}")
+
+
+def bump_versions(user_id: str, session_id: Optional[str] = None) -> None:
+    """
+    Increment the version stamps affected by a change.
+
+    Args:
+        user_id (str): The user whose session list changed.
+        session_id (Optional[str]): The session whose messages changed, if any.
+    """
+    collection = get_database()[VERSIONS_COLLECTION]
+    keys = [f"user:{user_id}"]
+    if session_id:
+        keys.append(f"session:{session_id}")
+    for key in keys:
+        collection.update_one({"_id": key}, {"$inc": {"v": 1}}, upsert=True)
+
+
+def bump_session_versions(user_id: str, session_ids: List[str]) -> None:
+    """
+    Increment the stamps of a user's session list and of many sessions at once.
+
+    Args:
+        user_id (str): The user whose session list changed.
+        session_ids (List[str]): The sessions whose messages changed.
+    """
+    bump_versions(user_id)
+    if session_ids:
+        get_database()[VERSIONS_COLLECTION].bulk_write(
+            [
+                UpdateOne({"_id": f"session:{s}"}, {"$inc": {"v": 1}}, upsert=True)
+                for s in session_ids
+            ],
+            ordered=False,
+        )
@@ -3,10 +3,13 @@ Authentication Service Module
 
 This module sets up the JWT authentication backend for the application using FastAPI Users.
 It configures a cookie transport with a max age of 3600 seconds and utilizes a database strategy
-(from the auth_repository) to manage token authentication.
+(from the auth_repository) to manage token authentication. Socket.IO connections
+are authenticated from the same cookie.
 """
 
 import base64
+from http.cookies import SimpleCookie
+from typing import Optional
 
 from fastapi_users import FastAPIUsers
 from fastapi_users.authentication import (
@@ -14,11 +17,11 @@ from fastapi_users.authentication import (
     CookieTransport,
     JWTStrategy,
 )
-from fastapi_users_db_beanie import ObjectIDIDMixin
+from fastapi_users_db_beanie import BeanieUserDatabase, ObjectIDIDMixin
 
 from ..config.config import settings
 from ..models.user import User
-from ..repositories.auth_repository import get_user_manager
+from ..repositories.auth_repository import UserManager, get_user_manager
 
 cookie_transport = CookieTransport(cookie_max_age=3600)
 
@@ -54,3 +57,26 @@ fastapi_users = FastAPIUsers[User, ObjectIDIDMixin](
 )
 
 current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+
+async def user_from_cookie_header(cookie_header: str) -> Optional[User]:
+    """
+    Resolve the active user whose auth cookie is in a raw Cookie header.
+
+    Used where FastAPI dependencies are not available, such as Socket.IO
+    connection handlers.
+
+    Args:
+        cookie_header (str): The value of the request's Cookie header.
+
+    Returns:
+        Optional[User]: The authenticated active user, or None.
+    """
+    morsel = SimpleCookie(cookie_header).get(cookie_transport.cookie_name)
+    if morsel is None:
+        return None
+    user = await get_jwt_strategy().read_token(
+        morsel.value, UserManager(BeanieUserDatabase(User))
+    )
+    return user if user and user.is_active else None
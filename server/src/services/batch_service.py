@@ -0,0 +1,358 @@
+"""
+batch_service.py
+
+This module runs batch prompt jobs. Prompts are answered on a bounded thread
+pool shared by every job, with a cap on how many prompts may be in flight per
+provider, so one large batch cannot exhaust a vendor's rate limit or starve the
+other providers. Results are buffered and written in bulk.
+
+Jobs are queued in MongoDB; the worker claims them, heartbeats while running
+and puts unfinished jobs back in the queue on shutdown, so a job resumes from
+its first unanswered prompt on whichever instance claims it next. A worker whose
+lease was taken over stops writing as soon as a flush finds the job reclaimed.
+
+Classes:
+- BatchRunner: Runs the prompts of one job on the shared pool.
+- BatchWorker: Claims queued jobs and runs them until shutdown.
+
+Functions:
+- run_prompt: Answer a single prompt with a fresh, history-less agent.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from agno.agent import Agent
+
+from ..config.config import settings
+from ..repositories.batch_repository import (
+    claim_batch_job,
+    finish_batch_job,
+    get_finished_prompts,
+    record_batch_results,
+    release_batch_job,
+)
+from ..services.provider_service import make_model
+from ..services.rate_limit_service import TOKENS, rate_limiter, tokens_used
+
+CLAIM_INTERVAL_SECONDS = 5.0
+
+PromptRunner = Callable[[str, str, str], Tuple[str, int]]
+ResultWriter = Callable[[str, List[dict], Optional[str]], bool]
+
+
+def run_prompt(provider: str, model_id: str, prompt: str) -> Tuple[str, int]:
+    """
+    Answer one prompt with the requested model, without fallbacks or history.
+
+    Args:
+        provider (str): Provider name.
+        model_id (str): Model ID.
+        prompt (str): The prompt.
+
+    Returns:
+        Tuple[str, int]: The answer and the LLM tokens it used.
+    """
+    agent = Agent(model=make_model(model_id, provider), storage=None, markdown=True)
+    response = agent.run(prompt)
+    content = response.content or ""
+    return content, tokens_used(response.metrics, prompt + content)
+
+
+class BatchRunner:
+    """
+    Runs the prompts of a job on a thread pool shared by all jobs.
+
+    A job's dispatching thread takes a slot from its provider's semaphore before
+    submitting each prompt, so pool threads only ever hold runnable work and a
+    saturated provider never blocks prompts for the others. Finished prompts are
+    numbered in completion order and flushed when the buffer is full or the
+    flush interval elapses; an empty flush still refreshes the job heartbeat. If a
+    flush reports the lease lost, the job stops and its unwritten results are
+    dropped for the new owner to redo.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        provider_limits: Dict[str, int],
+        default_limit: int,
+        answer: PromptRunner = run_prompt,
+        write: ResultWriter = record_batch_results,
+        flush_size: int = 50,
+        flush_seconds: float = 2.0,
+    ):
+        """
+        Args:
+            workers (int): Threads answering prompts across all jobs.
+            provider_limits (Dict[str, int]): Prompts in flight allowed per provider.
+            default_limit (int): Limit for providers missing from provider_limits.
+            answer (PromptRunner): Answers one prompt, returning text and tokens.
+            write (ResultWriter): Persists a buffer of results for a job, returning
+                False if the caller no longer owns the job.
+            flush_size (int): Results buffered before a bulk write.
+            flush_seconds (float): Longest time between two writes.
+        """
+        self.answer = answer
+        self.write = write
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="batch"
+        )
+        self._workers = workers
+        self._limits = {name.lower(): limit for name, limit in provider_limits.items()}
+        self._default_limit = default_limit
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, provider: str) -> threading.Semaphore:
+        with self._lock:
+            if provider not in self._semaphores:
+                limit = self._limits.get(provider, self._default_limit)
+                # More slots than threads would only queue prompts inside the pool.
+                limit = max(1, min(limit, self._workers))
+                self._semaphores[provider] = threading.BoundedSemaphore(limit)
+            return self._semaphores[provider]
+
+    def _answer(self, provider: str, model_id: str, index: int, prompt: str) -> dict:
+        started = time.perf_counter()
+        try:
+            content, tokens = self.answer(provider, model_id, prompt)
+            result = {"index": index, "content": content, "tokens": tokens}
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            result = {
+                "index": index,
+                "error": str(exc) or type(exc).__name__,
+                "tokens": 0,
+            }
+        result["latency"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def run(
+        self,
+        job_id: str,
+        provider: str,
+        model_id: str,
+        prompts: Iterable[Tuple[int, str]],
+        cancel: Optional[threading.Event] = None,
+        last_seq: int = 0,
+        on_flush: Optional[Callable[[List[dict]], None]] = None,
+        owner: Optional[str] = None,
+    ) -> bool:
+        """
+        Answer prompts of a job, blocking until they are all written.
+
+        When `cancel` is set no further prompts are started; prompts already in
+        flight are still awaited and written. Prompts dropped from the pool by
+        `shutdown` are not written, so the job is reported as unfinished.
+
+        Args:
+            job_id (str): The job the results belong to.
+            provider (str): Provider name.
+            model_id (str): Model ID.
+            prompts (Iterable[Tuple[int, str]]): (index, prompt) pairs to answer.
+            cancel (Optional[threading.Event]): Stops dispatching when set.
+            last_seq (int): Highest sequence number already written for the job.
+            on_flush (Optional[Callable[[List[dict]], None]]): Called with every
+                buffer after it is written.
+            owner (Optional[str]): The job's owner token, passed to every write.
+
+        Returns:
+            bool: True if every prompt was answered, False if cancelled early or
+            the lease was lost.
+        """
+        cancel = cancel or threading.Event()
+        semaphore = self._semaphore(provider.lower())
+        finished: "queue.Queue[Optional[dict]]" = queue.Queue()
+        buffer: List[dict] = []
+        state = {
+            "seq": last_seq,
+            "in_flight": 0,
+            "dropped": 0,
+            "lease_lost": False,
+            "flushed_at": time.monotonic(),
+        }
+
+        def flush(force: bool) -> None:
+            due = time.monotonic() - state["flushed_at"] >= self.flush_seconds
+            if not (force or due or len(buffer) >= self.flush_size):
+                return
+            batch = buffer[:]
+            buffer.clear()
+            if state["lease_lost"]:
+                return
+            if not self.write(job_id, batch, owner):
+                print(f"Batch job {job_id} was taken over by another worker")
+                state["lease_lost"] = True
+                cancel.set()
+                return
+            state["flushed_at"] = time.monotonic()
+            if on_flush and batch:
+                on_flush(batch)
+
+        def collect(block: bool) -> None:
+            while state["in_flight"]:
+                try:
+                    result = finished.get(block, self.flush_seconds)
+                except queue.Empty:
+                    break
+                block = False
+                state["in_flight"] -= 1
+                if result is None:
+                    state["dropped"] += 1
+                    continue
+                state["seq"] += 1
+                buffer.append({**result, "seq": state["seq"]})
+            flush(force=False)
+
+        def release(future) -> None:
+            semaphore.release()
+            finished.put(None if future.cancelled() else future.result())
+
+        completed = True
+        for index, prompt in prompts:
+            acquired = False
+            while not (acquired or cancel.is_set()):
+                acquired = semaphore.acquire(timeout=self.flush_seconds)
+                collect(block=False)
+            if not acquired:
+                completed = False
+                break
+            try:
+                future = self._executor.submit(
+                    self._answer, provider, model_id, index, prompt
+                )
+            except RuntimeError:
+                # The pool was shut down while this job was still dispatching.
+                semaphore.release()
+                completed = False
+                break
+            state["in_flight"] += 1
+            future.add_done_callback(release)
+        while state["in_flight"]:
+            collect(block=True)
+        flush(force=True)
+        return completed and not (state["dropped"] or state["lease_lost"])
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool without waiting for queued prompts.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BatchWorker:
+    """
+    Claims queued batch jobs and runs up to settings.batch_concurrent_jobs at once.
+
+    Attributes:
+        accepting (bool): False once shutdown has begun; no more jobs are claimed.
+    """
+
+    def __init__(self, runner: BatchRunner):
+        self.runner = runner
+        self.accepting = True
+        self._wake = asyncio.Event()
+        self._running: Dict[asyncio.Future, threading.Event] = {}
+
+    def notify(self) -> None:
+        """
+        Wake the worker so a newly submitted job is claimed without waiting for the poll.
+        """
+        self._wake.set()
+
+    def _process(self, job: dict, cancel: threading.Event) -> None:
+        job_id = job["_id"]
+        user_id = job["user_id"]
+        owner = job.get("owner")
+
+        def charge(results: List[dict]) -> None:
+            rate_limiter.charge(TOKENS, user_id, sum(r["tokens"] for r in results))
+
+        try:
+            done, last_seq = get_finished_prompts(job_id)
+            completed = self.runner.run(
+                job_id,
+                job["provider"],
+                job["model_id"],
+                ((i, p) for i, p in enumerate(job["prompts"]) if i not in done),
+                cancel,
+                last_seq,
+                on_flush=charge,
+                owner=owner,
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Batch job {job_id} failed: {exc}")
+            finish_batch_job(job_id, str(exc), owner)
+            return
+        if completed:
+            finish_batch_job(job_id, owner=owner)
+        else:
+            release_batch_job(job_id, owner)
+
+    def _forget(self, future: asyncio.Future) -> None:
+        self._running.pop(future, None)
+        self._wake.set()
+
+    async def run(self) -> None:
+        """
+        Claim and start jobs until shutdown, polling every CLAIM_INTERVAL_SECONDS
+        or as soon as a job is submitted or finishes.
+        """
+        loop = asyncio.get_running_loop()
+        while self.accepting:
+            self._wake.clear()
+            if len(self._running) < settings.batch_concurrent_jobs:
+                try:
+                    job = await loop.run_in_executor(
+                        None, claim_batch_job, settings.batch_job_lease_seconds
+                    )
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    print(f"Batch worker failed to claim a job: {exc}")
+                    job = None
+                if job:
+                    cancel = threading.Event()
+                    future = loop.run_in_executor(None, self._process, job, cancel)
+                    self._running[future] = cancel
+                    future.add_done_callback(self._forget)
+                    continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), CLAIM_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """
+        Stop claiming jobs and tell running jobs to stop dispatching prompts.
+        """
+        self.accepting = False
+        for cancel in self._running.values():
+            cancel.set()
+        self._wake.set()
+
+    async def wait(self, timeout: float) -> None:
+        """
+        Wait for running jobs to write their in-flight results and release themselves.
+
+        Args:
+            timeout (float): Seconds to wait at most.
+        """
+        if self._running:
+            await asyncio.wait(list(self._running), timeout=timeout)
+        self.runner.shutdown()
+
+
+batch_worker = BatchWorker(
+    BatchRunner(
+        workers=settings.batch_workers,
+        provider_limits=settings.batch_provider_concurrency,
+        default_limit=settings.batch_default_provider_concurrency,
+        flush_size=settings.batch_flush_size,
+        flush_seconds=settings.batch_flush_seconds,
+    )
+)
@@ -0,0 +1,37 @@
+"""
+bulk_service.py
+
+This module runs the background recovery of bulk session jobs. Bulk jobs run as
+request background tasks, which die with the server process, so a job caught
+by a restart or deploy is picked up here once its heartbeat goes stale instead
+of staying "running" forever.
+
+Functions:
+- run_bulk_job_recovery: Periodically resume bulk jobs whose runner stopped.
+"""
+
+import asyncio
+
+from ..repositories.bulk_repository import (
+    BULK_JOB_LEASE_SECONDS,
+    resume_stale_bulk_jobs,
+)
+
+RECOVERY_INTERVAL_SECONDS = 60.0
+
+
+async def run_bulk_job_recovery() -> None:
+    """
+    Resume stale bulk jobs at startup and every RECOVERY_INTERVAL_SECONDS.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            resumed = await loop.run_in_executor(
+                None, resume_stale_bulk_jobs, BULK_JOB_LEASE_SECONDS
+            )
+            if resumed:
+                print(f"Recovered {resumed} interrupted bulk jobs")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Bulk job recovery failed: {exc}")
+        await asyncio.sleep(RECOVERY_INTERVAL_SECONDS)
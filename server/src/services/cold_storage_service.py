@@ -0,0 +1,46 @@
+"""
+cold_storage_service.py
+
+This module runs the background archiver that moves sessions idle past
+settings.cold_session_age_days into compressed cold storage.
+
+Functions:
+- run_cold_storage_archiver: Periodically freeze idle sessions in batches.
+"""
+
+import asyncio
+
+from ..config.config import settings
+from ..repositories.cold_storage_repository import freeze_idle_sessions
+
+SECONDS_PER_DAY = 86400
+
+
+async def run_cold_storage_archiver() -> None:
+    """
+    Freeze idle sessions every settings.cold_archiver_interval_seconds.
+
+    Each cycle freezes batches until a batch comes back short, running the
+    blocking Mongo work in the default executor. Does nothing when the idle
+    age is set to 0.
+    """
+    if settings.cold_session_age_days <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    max_idle = settings.cold_session_age_days * SECONDS_PER_DAY
+    batch_size = settings.cold_archiver_batch_size
+    while True:
+        try:
+            total = 0
+            while True:
+                frozen = await loop.run_in_executor(
+                    None, freeze_idle_sessions, max_idle, batch_size
+                )
+                total += frozen
+                if frozen < batch_size:
+                    break
+            if total:
+                print(f"Moved {total} idle sessions to cold storage")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Cold storage archiver failed: {exc}")
+        await asyncio.sleep(settings.cold_archiver_interval_seconds)
@@ -0,0 +1,129 @@
+"""
+drain_service.py
+
+This module tracks in-flight generations so the server can shut down gracefully:
+stop accepting new generations, let running ones (including title generation and
+their persistence) finish within a deadline, and interrupt whatever is left,
+keeping the answers streamed so far.
+
+Draining starts on SIGINT/SIGTERM, before the ASGI server stops listening and
+closes WebSockets, so connected clients can still be told to reconnect and
+running generations keep streaming to them while they finish.
+
+Classes:
+- GenerationDrain: Registry of running generations and the accepting flag.
+
+Functions:
+- drain_on_shutdown_signal: Run a drain coroutine before the server's own
+  shutdown signal handler.
+"""
+
+import asyncio
+import signal
+import threading
+from typing import Awaitable, Callable, Dict
+
+from ..services.generation_service import Generation
+
+
+class GenerationDrain:
+    """
+    Registry of generations running in executor threads.
+
+    Attributes:
+        accepting (bool): False once shutdown has begun; new generations must be refused.
+    """
+
+    def __init__(self):
+        self.accepting = True
+        self._active: Dict[asyncio.Future, Generation] = {}
+
+    @property
+    def active(self) -> int:
+        """
+        Number of generations still running.
+        """
+        return len(self._active)
+
+    def submit(self, generation: Generation) -> asyncio.Future:
+        """
+        Run a generation in the default executor and track it until it finishes.
+
+        Args:
+            generation (Generation): The generation to run.
+
+        Returns:
+            asyncio.Future: Resolves with the full response once the run, its
+            persistence and its title generation are done.
+        """
+        future = asyncio.get_running_loop().run_in_executor(None, generation.run)
+        self._active[future] = generation
+        future.add_done_callback(lambda f: self._active.pop(f, None))
+        return future
+
+    async def drain(self, deadline: float, grace: float = 5.0) -> None:
+        """
+        Stop accepting generations and wait for the running ones.
+
+        Generations still running after the deadline are interrupted, then given
+        a short grace period to stop streaming and persist their partial answer.
+
+        Args:
+            deadline (float): Seconds to wait for running generations to finish.
+            grace (float): Seconds to wait for cancelled generations to stop.
+        """
+        self.accepting = False
+        if not self._active:
+            return
+        _done, pending = await asyncio.wait(list(self._active), timeout=deadline)
+        if not pending:
+            return
+        print(
+            f"Interrupting {len(pending)} generations still running after {deadline}s"
+        )
+        for future in pending:
+            generation = self._active.get(future)
+            if generation:
+                generation.interrupt()
+        await asyncio.wait(pending, timeout=grace)
+
+
+generation_drain = GenerationDrain()
+
+
+def drain_on_shutdown_signal(drain: Callable[[], Awaitable[None]]) -> None:
+    """
+    Run `drain` when SIGINT or SIGTERM arrives, then hand the signal to the
+    handler that was installed before (uvicorn's, which starts its shutdown).
+
+    A second signal skips the drain and goes straight to the previous handler.
+    Does nothing outside the main thread, where signal handlers cannot be set.
+
+    Args:
+        drain (Callable[[], Awaitable[None]]): Coroutine function run on the event loop.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    signals = (signal.SIGINT, signal.SIGTERM)
+    previous = {sig: signal.getsignal(sig) for sig in signals}
+
+    def forward(sig, frame) -> None:
+        handler = previous[sig]
+        if callable(handler):
+            handler(sig, frame)
+        else:
+            signal.signal(sig, handler)
+            signal.raise_signal(sig)
+
+    def start(sig, frame) -> None:
+        task = asyncio.ensure_future(drain())
+        task.add_done_callback(lambda _task: forward(sig, frame))
+
+    def handle(sig, frame) -> None:
+        for other in signals:
+            signal.signal(other, forward)
+        loop.call_soon_threadsafe(start, sig, frame)
+
+    for sig in signals:
+        signal.signal(sig, handle)
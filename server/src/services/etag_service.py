@@ -0,0 +1,67 @@
+"""
+etag_service.py
+
+This module builds ETags from version stamps and evaluates If-None-Match
+request headers so read endpoints can answer 304 Not Modified cheaply.
+
+Functions:
+- make_etag: Build a strong ETag from its parts.
+- is_not_modified: Check a request's If-None-Match header against an ETag.
+- not_modified_response: Build the 304 response for an ETag.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the values the response depends on.
+
+    Args:
+        *parts: Version stamps, user IDs and query parameters.
+
+    Returns:
+        str: A quoted ETag value.
+    """
+    raw = "|".join(str(p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check whether the client already holds the representation for an ETag.
+
+    Args:
+        request (Request): The incoming request.
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: True if If-None-Match matches the ETag (weak comparison) or is "*".
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Build an empty 304 response carrying the ETag.
+
+    Args:
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        Response: HTTP 304 Not Modified.
+    """
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
@@ -0,0 +1,291 @@
+"""
+generation_service.py
+
+This module runs the assistant generation pipeline shared by the Socket.IO and
+HTTP streaming transports: rate-limit checks, hedged streaming through the
+provider fallback chain, token accounting, version bumps after persistence,
+incremental search indexing and title generation for new sessions.
+
+Classes:
+- Generation: One assistant answer for a session, run in an executor thread and
+  reported through transport-specific callbacks.
+
+Functions:
+- check_generation_limits: Check a user's generation and token buckets.
+- find_session: Look up the owner and tombstone of a session.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from agno.agent import Agent, Message
+from agno.memory.agent import AgentRun
+
+from ..repositories.cold_storage_repository import ensure_hot
+from ..repositories.search_repository import index_session_messages, index_session_title
+from ..repositories.version_repository import bump_versions
+from ..services.provider_service import HedgedStream, make_model, resolve_chain
+from ..services.rate_limit_service import GENERATIONS, TOKENS, rate_limiter, tokens_used
+
+TITLE_PROMPT = (
+    "Generate a short conversation title (must be less than 40 chars, your response purely "
+    "contains ONLY the title, no quotation marks at the begin or end) summarizing the "
+    "following response:\n{response}"
+)
+
+
+def check_generation_limits(user_id: str) -> Optional[Tuple[str, float]]:
+    """
+    Check whether a user may start a new generation.
+
+    The token bucket is only checked for debt; the generation bucket is consumed.
+
+    Args:
+        user_id (str): The user starting the generation.
+
+    Returns:
+        Optional[Tuple[str, float]]: The exhausted bucket and its retry-after
+        seconds, or None if the generation may start.
+    """
+    for bucket, cost in ((TOKENS, 0), (GENERATIONS, 1)):
+        retry_after = rate_limiter.hit(bucket, user_id, cost)
+        if retry_after:
+            return bucket, retry_after
+    return None
+
+
+def find_session(storage, session_id: str) -> Optional[dict]:
+    """
+    Look up the owner and deletion tombstone of a session.
+
+    Args:
+        storage: The agno MongoDbStorage holding sessions.
+        session_id (str): The session ID.
+
+    Returns:
+        Optional[dict]: The session's "user_id" and "deleted_at" fields, or None
+        if the session has never been persisted.
+    """
+    return storage.collection.find_one(
+        {"session_id": session_id}, {"user_id": 1, "deleted_at": 1}
+    )
+
+
+class Generation:
+    """
+    One assistant answer for a session.
+
+    `run` is blocking and meant for an executor thread. Progress is reported
+    through the callbacks, which are invoked from that thread:
+    - on_delta(delta, content): a new chunk and the full response so far.
+    - on_done(content, error): the answer finished, error is None on success.
+    - on_title(title): the generated title of a new session.
+
+    Setting `cancel` stops streaming at the next chunk; the run is then not
+    persisted and on_done is called with error "cancelled". `interrupt` stops
+    it the same way but persists the partial answer and reports "interrupted".
+    """
+
+    def __init__(
+        self,
+        storage,
+        session_id: str,
+        user_id: str,
+        model_id: str,
+        provider: str,
+        prompt: str,
+        is_new_session: bool,
+        on_delta: Callable[[str, str], None],
+        on_done: Callable[[str, Optional[str]], None],
+        on_title: Optional[Callable[[str], None]] = None,
+        cancel: Optional[threading.Event] = None,
+    ):
+        self.storage = storage
+        self.session_id = session_id
+        self.user_id = user_id
+        self.model_id = model_id
+        self.provider = provider
+        self.prompt = prompt
+        self.is_new_session = is_new_session
+        self.on_delta = on_delta
+        self.on_done = on_done
+        self.on_title = on_title
+        self.cancel = cancel or threading.Event()
+        self._keep_partial = threading.Event()
+        self._agents: Dict[Tuple[str, str], Agent] = {}
+
+    def interrupt(self) -> None:
+        """
+        Stop streaming at the next chunk but keep what was streamed so far.
+        """
+        self._keep_partial.set()
+        self.cancel.set()
+
+    def _start(self, candidate_provider: str, candidate_model: str):
+        """
+        Opens an agent stream for one candidate of the fallback chain.
+        """
+        agent = Agent(
+            model=make_model(candidate_model, candidate_provider),
+            storage=self.storage,
+            session_id=self.session_id,
+            user_id=self.user_id,
+            markdown=True,
+            add_history_to_messages=not self.is_new_session,
+        )
+        self._agents[(candidate_provider, candidate_model)] = agent
+        response = ""
+        try:
+            for chunk in agent.run(self.prompt, stream=True):
+                response += chunk.content or ""
+                yield chunk.content or ""
+        finally:
+            metrics = agent.run_response.metrics if agent.run_response else None
+            rate_limiter.charge(
+                TOKENS, self.user_id, tokens_used(metrics, self.prompt + response)
+            )
+
+    def _generate_title(self, response: str, winner: Tuple[str, str]) -> str:
+        title_provider, title_model = winner
+        title_agent = Agent(
+            model=make_model(title_model, title_provider),
+            storage=None,
+            markdown=False,
+        )
+        title_prompt = TITLE_PROMPT.format(response=response)
+        try:
+            title_response = title_agent.run(title_prompt)
+            title = title_response.content or "Untitled"
+            rate_limiter.charge(
+                TOKENS,
+                self.user_id,
+                tokens_used(title_response.metrics, title_prompt + title),
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            title = "Untitled"
+
+        self.storage.collection.update_one(
+            {"session_id": self.session_id},
+            {"$set": {"session_data.session_name": title}},
+        )
+        bump_versions(self.user_id)
+        index_session_title(self.session_id, self.user_id, title)
+        return title
+
+    def _persist_partial(self, winner: Optional[Tuple[str, str]], response: str):
+        """
+        Stores a stopped run the way agno would have stored the finished one.
+
+        agno only writes the session after the model stream ends, so a run
+        closed mid-stream would otherwise lose both the prompt and the answer.
+        """
+        agent = self._agents.get(winner)
+        if agent is None or agent.run_messages is None:
+            return
+        user_message = agent.run_messages.user_message
+        if user_message is None:
+            return
+        if any(
+            run.response is not None and run.response.run_id == agent.run_id
+            for run in agent.memory.runs
+        ):
+            return
+        agent.run_response.content = response
+        agent.memory.add_messages(
+            messages=[user_message, Message(role="assistant", content=response)]
+        )
+        agent.memory.add_run(
+            AgentRun(message=user_message, response=agent.run_response)
+        )
+        agent.write_to_storage()
+
+    def _guarded(self, step: str, func: Callable, *args, **kwargs):
+        """
+        Runs a post-generation step, logging instead of raising on failure.
+        """
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Failed to {step} for session {self.session_id}: {exc}")
+            return None
+
+    def run(self) -> str:
+        """
+        Stream the answer, then generate a title if the session is new.
+
+        A cold session is hydrated first so the agent sees its full history; if
+        that fails, on_done reports the error like any other failed generation.
+        Failures after the answer was persisted (version bumps, indexing, title
+        generation) are logged and never keep on_done or on_title from firing.
+
+        Returns:
+            str: The full response, possibly partial if it failed or was cancelled.
+        """
+        if not self.is_new_session:
+            try:
+                ensure_hot(self.session_id)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.on_done("", str(exc))
+                return ""
+        started_at = int(time.time())
+        stream = HedgedStream(resolve_chain(self.model_id, self.provider), self._start)
+        chunks = iter(stream)
+        full_response = ""
+        try:
+            for delta in chunks:
+                if self.cancel.is_set():
+                    break
+                full_response += delta
+                self.on_delta(delta, full_response)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.on_done(full_response, str(exc))
+            return full_response
+        finally:
+            chunks.close()
+        if self.cancel.is_set():
+            if not self._keep_partial.is_set():
+                self.on_done(full_response, "cancelled")
+                return full_response
+            if full_response:
+                self._guarded(
+                    "persist partial answer",
+                    self._persist_partial,
+                    stream.winner,
+                    full_response,
+                )
+                self._guarded(
+                    "bump versions", bump_versions, self.user_id, self.session_id
+                )
+                self._guarded(
+                    "index messages",
+                    index_session_messages,
+                    self.session_id,
+                    self.user_id,
+                    since=started_at,
+                )
+            self.on_done(full_response, "interrupted")
+            return full_response
+
+        # Bump before reporting done so a refetch never revalidates a stale ETag,
+        # but never let bookkeeping keep the client from getting its done event.
+        self._guarded("bump versions", bump_versions, self.user_id, self.session_id)
+        self.on_done(full_response, None)
+        self._guarded(
+            "index messages",
+            index_session_messages,
+            self.session_id,
+            self.user_id,
+            since=started_at,
+        )
+
+        if self.is_new_session:
+            title = self._guarded(
+                "generate title",
+                self._generate_title,
+                full_response,
+                stream.winner or (self.provider, self.model_id),
+            )
+            if self.on_title:
+                self.on_title(title or "Untitled")
+        return full_response
@@ -0,0 +1,376 @@
+"""
+provider_service.py
+
+This module builds LLM model instances for the supported vendors and adds the
+resilience layer on top of them: per-model fallback chains, per-provider health
+scoring and hedged streaming on time-to-first-token.
+
+Features include:
+- make_model: Factory returning an agno model for a provider name.
+- close_provider_clients: Close the HTTP clients of every live model on shutdown.
+- ProviderHealth: Tracks failures and first-token latency per provider.
+- resolve_chain: Expands a (provider, model) pair into its configured fallback chain.
+- HedgedStream: Streams from the first candidate to produce a token, starting the
+  next candidate when the current one errors or misses the first-token deadline.
+
+Dependencies:
+- agno model providers (Google, Cohere, Mistral, Groq, OpenRouter)
+- Threading primitives, since agno streams are synchronous generators
+"""
+
+import inspect
+import itertools
+import queue
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agno.models.cohere import Cohere
+from agno.models.google import Gemini
+from agno.models.groq import Groq
+from agno.models.mistral import MistralChat
+from agno.models.openrouter import OpenRouter
+
+from ..config.config import settings
+
+Candidate = Tuple[str, str]
+PROVIDERS = ("google", "cohere", "mistral", "groq", "openrouter")
+
+# Models created by make_model that are still referenced
+_live_models: "weakref.WeakValueDictionary[int, object]" = weakref.WeakValueDictionary()
+_model_keys = itertools.count()
+CLIENT_ATTRIBUTES = ("client", "async_client", "mistral_client", "http_client")
+
+
+def _build_model(id: str, provider: str):
+    p = (provider or "").lower()
+    if p == "google":
+        return Gemini(id=id, api_key=settings.google_api_key)
+    if p == "cohere":
+        return Cohere(id=id, api_key=settings.co_api_key)
+    if p == "mistral":
+        return MistralChat(id=id, api_key=settings.mistral_api_key)
+    if p == "groq":
+        return Groq(id=id, api_key=settings.groq_api_key)
+    if p == "openrouter":
+        return OpenRouter(id=id, api_key=settings.openrouter_api_key)
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def make_model(id: str, provider: str):
+    """
+    Factory function that returns a model instance based on the provider name.
+
+    The model is tracked so its HTTP clients can be closed on shutdown.
+
+    Parameters:
+        id (str): Model ID to use.
+        provider (str): Name of the provider (e.g., 'google', 'cohere').
+
+    Returns:
+        An instance of the corresponding model class with configured API key.
+
+    Raises:
+        ValueError: If the provider is unknown.
+    """
+    model = _build_model(id, provider)
+    _live_models[next(_model_keys)] = model
+    return model
+
+
+async def close_provider_clients() -> None:
+    """
+    Close the HTTP clients held by every model that is still alive.
+
+    Sync and async `close` methods are both supported; errors are ignored since
+    this only runs during shutdown.
+    """
+    for model in list(_live_models.values()):
+        for attribute in CLIENT_ATTRIBUTES:
+            close = getattr(getattr(model, attribute, None), "close", None)
+            if not callable(close):
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass
+    _live_models.clear()
+
+
+class ProviderHealth:
+    """
+    Thread-safe health scoreboard for model providers.
+
+    Each provider keeps an exponentially weighted failure rate and first-token
+    latency. Errors and missed first-token deadlines both count as failures, so a
+    provider that is consistently slow is skipped like one that is down. A
+    provider is considered degraded while its failure score is above
+    the threshold and its last failure happened within the cooldown window; once
+    the cooldown elapses it is tried again.
+
+    Attributes:
+        degraded_score (float): Failure score at which a provider is skipped.
+        cooldown_seconds (float): How long a degraded provider is skipped for.
+        alpha (float): Smoothing factor for the moving averages.
+    """
+
+    def __init__(
+        self, degraded_score: float, cooldown_seconds: float, alpha: float = 0.3
+    ):
+        self.degraded_score = degraded_score
+        self.cooldown_seconds = cooldown_seconds
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+
+    def _entry(self, provider: str) -> dict:
+        return self._stats.setdefault(
+            provider.lower(), {"score": 0.0, "ttft": None, "last_failure": None}
+        )
+
+    def record_success(self, provider: str, ttft: float) -> None:
+        """
+        Record that a provider produced its first token.
+
+        Args:
+            provider (str): Provider name.
+            ttft (float): Seconds until the first token arrived.
+        """
+        with self._lock:
+            entry = self._entry(provider)
+            entry["score"] *= 1 - self.alpha
+            prev = entry["ttft"]
+            entry["ttft"] = ttft if prev is None else prev + self.alpha * (ttft - prev)
+
+    def record_failure(self, provider: str) -> None:
+        """
+        Record that a provider raised or missed the first-token deadline.
+
+        Args:
+            provider (str): Provider name.
+        """
+        with self._lock:
+            entry = self._entry(provider)
+            entry["score"] += self.alpha * (1 - entry["score"])
+            entry["last_failure"] = time.monotonic()
+
+    def is_degraded(self, provider: str) -> bool:
+        """
+        Check whether a provider should currently be skipped.
+
+        Args:
+            provider (str): Provider name.
+
+        Returns:
+            bool: True if the provider failed recently and often enough.
+        """
+        with self._lock:
+            entry = self._stats.get(provider.lower())
+            if not entry or entry["last_failure"] is None:
+                return False
+            recent = time.monotonic() - entry["last_failure"] < self.cooldown_seconds
+            return recent and entry["score"] >= self.degraded_score
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Return a copy of the current per-provider statistics.
+
+        Returns:
+            Dict[str, dict]: Failure score and smoothed first-token latency by provider.
+        """
+        with self._lock:
+            return {
+                name: {"score": entry["score"], "ttft": entry["ttft"]}
+                for name, entry in self._stats.items()
+            }
+
+
+provider_health = ProviderHealth(
+    degraded_score=settings.provider_degraded_score,
+    cooldown_seconds=settings.provider_cooldown_seconds,
+)
+
+
+def _parse_candidate(entry: str) -> Candidate:
+    provider, _, model_id = entry.partition(":")
+    return provider.strip().lower(), model_id.strip()
+
+
+def resolve_chain(
+    model_id: str,
+    provider: str,
+    fallbacks: Optional[Dict[str, List[str]]] = None,
+    health: Optional[ProviderHealth] = None,
+) -> List[Candidate]:
+    """
+    Build the ordered list of (provider, model) candidates for a request.
+
+    Fallbacks are looked up first by "provider:model" and then by "provider" alone,
+    with entries written as "provider:model". Degraded providers are dropped unless
+    that would leave nothing to try.
+
+    Args:
+        model_id (str): The requested model ID.
+        provider (str): The requested provider name.
+        fallbacks (Optional[Dict[str, List[str]]]): Chain configuration, defaults to settings.
+        health (Optional[ProviderHealth]): Health scoreboard, defaults to the shared one.
+
+    Returns:
+        List[Candidate]: Candidates in the order they should be attempted.
+    """
+    fallbacks = settings.provider_fallbacks if fallbacks is None else fallbacks
+    health = health or provider_health
+    primary = ((provider or "").lower(), model_id)
+    chain = fallbacks.get(f"{primary[0]}:{model_id}") or fallbacks.get(primary[0], [])
+
+    candidates = [primary]
+    for entry in chain:
+        candidate = _parse_candidate(entry)
+        if candidate not in candidates:
+            candidates.append(candidate)
+
+    healthy = [c for c in candidates if not health.is_degraded(c[0])]
+    return healthy or candidates
+
+
+class HedgedStream:
+    """
+    Iterate over the text deltas of whichever candidate answers first.
+
+    Candidates run in their own threads. The next candidate is started when the
+    current ones fail or when none has produced a token within the first-token
+    timeout; the timeout is reported to the health scoreboard as a failure of
+    the candidate that missed it. If no candidate has produced a token after
+    one timeout per candidate, the last one is reported as failed too and
+    iteration raises TimeoutError. The first candidate to yield a token wins
+    and every other attempt is told to stop, which closes its generator without
+    persisting anything.
+
+    Attributes:
+        winner (Optional[Candidate]): The candidate whose output is being streamed.
+    """
+
+    def __init__(
+        self,
+        candidates: List[Candidate],
+        start: Callable[[str, str], Iterable[str]],
+        first_token_timeout: Optional[float] = None,
+        health: Optional[ProviderHealth] = None,
+    ):
+        """
+        Args:
+            candidates (List[Candidate]): Ordered (provider, model) pairs to try.
+            start (Callable[[str, str], Iterable[str]]): Opens a delta stream for a candidate.
+            first_token_timeout (Optional[float]): Seconds to wait before hedging,
+                defaults to settings.first_token_timeout.
+            health (Optional[ProviderHealth]): Scoreboard to report outcomes to.
+        """
+        if not candidates:
+            raise ValueError("At least one candidate is required")
+        self.candidates = candidates
+        self.start = start
+        self.first_token_timeout = (
+            settings.first_token_timeout
+            if first_token_timeout is None
+            else first_token_timeout
+        )
+        self.health = health or provider_health
+        self.winner: Optional[Candidate] = None
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        self._stops: List[threading.Event] = []
+
+    def _attempt(self, index: int, stop: threading.Event) -> None:
+        provider, model_id = self.candidates[index]
+        started = time.monotonic()
+        first = True
+        try:
+            stream = iter(self.start(provider, model_id))
+            try:
+                for delta in stream:
+                    if stop.is_set():
+                        return
+                    if first:
+                        self.health.record_success(provider, time.monotonic() - started)
+                        first = False
+                    self._events.put((index, "delta", delta))
+            finally:
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
+            self._events.put((index, "done", None))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.health.record_failure(provider)
+            self._events.put((index, "error", exc))
+
+    def _launch(self) -> None:
+        stop = threading.Event()
+        index = len(self._stops)
+        self._stops.append(stop)
+        threading.Thread(target=self._attempt, args=(index, stop), daemon=True).start()
+
+    def _cancel_others(self, keep: Optional[int] = None) -> None:
+        for index, stop in enumerate(self._stops):
+            if index != keep:
+                stop.set()
+
+    def __iter__(self) -> Iterator[str]:
+        self._launch()
+        pending = 1
+        winner = None
+        last_error: Optional[BaseException] = None
+        deadline = time.monotonic() + self.first_token_timeout * len(self.candidates)
+        try:
+            while True:
+                timeout = None
+                can_hedge = False
+                if winner is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        slow_provider = self.candidates[len(self._stops) - 1][0]
+                        self.health.record_failure(slow_provider)
+                        raise TimeoutError(
+                            "No provider produced a first token within "
+                            f"{self.first_token_timeout * len(self.candidates):g}s"
+                        )
+                    can_hedge = len(self._stops) < len(self.candidates)
+                    timeout = (
+                        min(self.first_token_timeout, remaining)
+                        if can_hedge
+                        else remaining
+                    )
+                try:
+                    index, kind, payload = self._events.get(timeout=timeout)
+                except queue.Empty:
+                    if can_hedge and time.monotonic() < deadline:
+                        slow_provider = self.candidates[len(self._stops) - 1][0]
+                        self.health.record_failure(slow_provider)
+                        self._launch()
+                        pending += 1
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+                if kind == "error":
+                    if winner is not None:
+                        raise payload
+                    pending -= 1
+                    last_error = payload
+                    if len(self._stops) < len(self.candidates):
+                        self._launch()
+                        pending += 1
+                    elif pending == 0:
+                        raise last_error
+                    continue
+
+                if winner is None:
+                    winner = index
+                    self.winner = self.candidates[index]
+                    self._cancel_others(keep=index)
+                if kind == "done":
+                    return
+                yield payload
+        finally:
+            self._cancel_others()
@@ -0,0 +1,41 @@
+"""
+purge_service.py
+
+This module runs the background purger that permanently removes soft-deleted
+sessions once their undo window has passed.
+
+Functions:
+- run_session_purger: Periodically purge tombstoned sessions in rate-limited batches.
+"""
+
+import asyncio
+
+from ..config.config import settings
+from ..repositories.agent_repository import purge_deleted_sessions
+
+
+async def run_session_purger() -> None:
+    """
+    Purge expired tombstones every settings.purge_interval_seconds.
+
+    Each cycle removes batches of settings.purge_batch_size sessions, pausing
+    settings.purge_batch_pause_seconds between batches to limit the write load,
+    until a batch comes back short.
+    """
+    loop = asyncio.get_running_loop()
+    batch_size = settings.purge_batch_size
+    while True:
+        try:
+            while True:
+                purged = await loop.run_in_executor(
+                    None,
+                    purge_deleted_sessions,
+                    settings.session_undo_window_seconds,
+                    batch_size,
+                )
+                if purged < batch_size:
+                    break
+                await asyncio.sleep(settings.purge_batch_pause_seconds)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            print(f"Session purger failed: {exc}")
+        await asyncio.sleep(settings.purge_interval_seconds)
@@ -0,0 +1,279 @@
+"""
+rate_limit_service.py
+
+This module implements per-user token-bucket rate limiting for generations,
+LLM tokens consumed and REST reads.
+
+Buckets are kept in a pluggable backend: an in-process dictionary by default,
+or a MongoDB collection when several server processes must share the same limits.
+
+Features include:
+- RateLimitBackend: Interface for atomic token-bucket storage.
+- InMemoryRateLimitBackend / MongoRateLimitBackend: Backend implementations.
+- RateLimiter: Applies the configured bucket limits for a user.
+- rate_limited: FastAPI dependency returning the user or raising a 429.
+
+Dependencies:
+- FastAPI for the HTTP dependency and 429 responses
+- PyMongo for the shared backend
+"""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from pymongo import ReturnDocument
+
+from ..config.config import settings
+from ..models.user import User
+from ..repositories.connection import get_database
+from ..services.auth_service import current_active_user
+
+GENERATIONS = "generations"
+TOKENS = "tokens"
+READS = "reads"
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage interface for token buckets.
+
+    Implementations must refill and consume a bucket atomically.
+    """
+
+    @abstractmethod
+    def consume(
+        self, key: str, cost: float, capacity: float, refill_rate: float, force: bool
+    ) -> Tuple[bool, float]:
+        """
+        Refill a bucket and try to take `cost` tokens from it.
+
+        Args:
+            key (str): Bucket key.
+            cost (float): Tokens to take.
+            capacity (float): Maximum tokens the bucket holds.
+            refill_rate (float): Tokens added per second.
+            force (bool): Take the tokens even if it drives the bucket negative.
+
+        Returns:
+            Tuple[bool, float]: Whether the tokens were taken, and the tokens left.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Process-local token buckets guarded by a lock.
+
+    A bucket that has refilled to capacity is indistinguishable from a missing
+    one, so such buckets are swept out at most every `sweep_seconds`.
+    """
+
+    def __init__(self, sweep_seconds: float = 60.0):
+        self.sweep_seconds = sweep_seconds
+        self._lock = threading.Lock()
+        # key -> (tokens, updated, time at which the bucket is full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._swept = time.monotonic()
+
+    def _sweep(self, now: float) -> None:
+        self._swept = now
+        full = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in full:
+            del self._buckets[key]
+
+    def consume(self, key, cost, capacity, refill_rate, force):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._swept >= self.sweep_seconds:
+                self._sweep(now)
+            tokens, updated, _full_at = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = force or tokens >= cost
+            if allowed:
+                tokens -= cost
+            if tokens >= capacity:
+                full_at = now
+            elif refill_rate > 0:
+                full_at = now + (capacity - tokens) / refill_rate
+            else:
+                full_at = math.inf
+            self._buckets[key] = (tokens, now, full_at)
+        return allowed, tokens
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets shared between processes through a MongoDB collection.
+
+    Each bucket is a single document updated with an aggregation pipeline so the
+    refill and the consumption happen in one atomic write.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def consume(self, key, cost, capacity, refill_rate, force):
+        now = time.time()
+        refilled = {
+            "$min": [
+                capacity,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {
+                            "$multiply": [
+                                {"$subtract": [now, {"$ifNull": ["$updated", now]}]},
+                                refill_rate,
+                            ]
+                        },
+                    ]
+                },
+            ]
+        }
+        allowed = {"$literal": True} if force else {"$gte": ["$tokens", cost]}
+        doc = self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated": now}},
+                {"$set": {"allowed": allowed}},
+                {
+                    "$set": {
+                        "tokens": {
+                            "$cond": [
+                                "$allowed",
+                                {"$subtract": ["$tokens", cost]},
+                                "$tokens",
+                            ]
+                        }
+                    }
+                },
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["allowed"], doc["tokens"]
+
+
+class RateLimiter:
+    """
+    Applies named token-bucket limits per user.
+
+    Attributes:
+        backend (RateLimitBackend): Where bucket state is stored.
+        limits (Dict[str, Tuple[float, float]]): Bucket name to (capacity, period seconds).
+    """
+
+    def __init__(
+        self, backend: RateLimitBackend, limits: Dict[str, Tuple[float, float]]
+    ):
+        self.backend = backend
+        self.limits = limits
+
+    def _consume(
+        self, bucket: str, user_id: str, cost: float, force: bool
+    ) -> Tuple[bool, float, float]:
+        capacity, period = self.limits[bucket]
+        refill_rate = capacity / period
+        allowed, tokens = self.backend.consume(
+            f"{bucket}:{user_id}", cost, capacity, refill_rate, force
+        )
+        return allowed, tokens, refill_rate
+
+    def hit(self, bucket: str, user_id: str, cost: float = 1.0) -> float:
+        """
+        Try to take `cost` tokens from a user's bucket.
+
+        A cost of zero only checks that the bucket is not in debt.
+
+        Args:
+            bucket (str): Bucket name (generations, tokens or reads).
+            user_id (str): The user the bucket belongs to.
+            cost (float): Tokens to take.
+
+        Returns:
+            float: 0 if allowed, otherwise the seconds to wait before retrying.
+        """
+        if self.limits[bucket][0] <= 0:
+            return 0.0
+        allowed, tokens, refill_rate = self._consume(bucket, user_id, cost, False)
+        if allowed:
+            return 0.0
+        return (cost - tokens) / refill_rate
+
+    def charge(self, bucket: str, user_id: str, cost: float) -> None:
+        """
+        Unconditionally take tokens from a user's bucket, allowing it to go into debt.
+
+        Used for costs only known after the fact, such as LLM tokens consumed.
+
+        Args:
+            bucket (str): Bucket name.
+            user_id (str): The user the bucket belongs to.
+            cost (float): Tokens to take.
+        """
+        if self.limits[bucket][0] <= 0 or cost <= 0:
+            return
+        self._consume(bucket, user_id, cost, True)
+
+
+def _make_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend.lower() == "mongo":
+        return MongoRateLimitBackend(get_database()["rate_limits"])
+    return InMemoryRateLimitBackend()
+
+
+rate_limiter = RateLimiter(
+    _make_backend(),
+    {
+        GENERATIONS: (settings.rate_limit_generations_per_minute, 60.0),
+        TOKENS: (settings.rate_limit_tokens_per_hour, 3600.0),
+        READS: (settings.rate_limit_reads_per_minute, 60.0),
+    },
+)
+
+
+def tokens_used(metrics: Optional[dict], text: str) -> int:
+    """
+    Count the LLM tokens used by a run.
+
+    Args:
+        metrics (Optional[dict]): agno run metrics, with per-call 'total_tokens' lists.
+        text (str): Prompt and response text, used for an estimate when metrics are missing.
+
+    Returns:
+        int: Tokens reported by the provider, or roughly one token per four characters.
+    """
+    total = (metrics or {}).get("total_tokens")
+    if isinstance(total, list):
+        total = sum(total)
+    return int(total) if total else math.ceil(len(text) / 4)
+
+
+def rate_limited(bucket: str):
+    """
+    Build a FastAPI dependency that rate limits the current user.
+
+    Args:
+        bucket (str): Bucket to take one token from per request.
+
+    Returns:
+        Callable: A dependency resolving to the authenticated user.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when the bucket is empty.
+    """
+
+    async def dependency(user: User = Depends(current_active_user)) -> User:
+        retry_after = rate_limiter.hit(bucket, str(user.id))
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        return user
+
+    return dependency
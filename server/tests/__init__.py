@@ -0,0 +1 @@
+# server\tests\__init__.py
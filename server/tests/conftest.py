@@ -0,0 +1,23 @@
+"""
+Shared test setup.
+
+Settings are loaded at import time, so placeholder values for the required
+environment variables are set before any application module is imported.
+"""
+
+import os
+
+for name in (
+    "MONGODB_URI",
+    "GOOGLE_API_KEY",
+    "CO_API_KEY",
+    "GROQ_API_KEY",
+    "MISTRAL_API_KEY",
+    "OPENROUTER_API_KEY",
+    "ACCESS_PUBLIC_KEY",
+    "ACCESS_PRIVATE_KEY",
+    "RESET_SECRET",
+    "VERIFICATION_SECRET",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("PORT", "8000")
@@ -0,0 +1,139 @@
+"""
+Tests for provider fallback chains and hedged first-token streaming, run against
+the fake vendors used by the failover benchmark.
+"""
+
+import time
+
+import pytest
+from benchmarks.fake_provider import FakeProvider, FakeVendors
+from src.services.provider_service import HedgedStream, ProviderHealth, resolve_chain
+
+FALLBACKS = {"groq": ["openrouter:fake-or", "google:fake-gemini"]}
+TIMEOUT = 0.1
+
+
+def make_health() -> ProviderHealth:
+    return ProviderHealth(degraded_score=0.5, cooldown_seconds=60.0)
+
+
+def stream(providers: dict, health: ProviderHealth, fallbacks=None):
+    chain = resolve_chain(
+        "fake-groq",
+        "groq",
+        fallbacks=FALLBACKS if fallbacks is None else fallbacks,
+        health=health,
+    )
+    return HedgedStream(chain, FakeVendors(providers).start, TIMEOUT, health)
+
+
+def test_healthy_primary_wins():
+    health = make_health()
+    hedged = stream(
+        {
+            "groq": FakeProvider(tokens=3),
+            "openrouter": FakeProvider(tokens=3),
+            "google": FakeProvider(tokens=3),
+        },
+        health,
+    )
+    assert "".join(hedged) == "fake-groq-0-0 fake-groq-0-1 fake-groq-0-2 "
+    assert hedged.winner == ("groq", "fake-groq")
+    assert not health.is_degraded("groq")
+
+
+def test_slow_primary_is_hedged_and_eventually_degraded():
+    health = make_health()
+    providers = {
+        "groq": FakeProvider(first_token_delay=1.0),
+        "openrouter": FakeProvider(),
+        "google": FakeProvider(),
+    }
+    for _ in range(2):
+        started = time.monotonic()
+        hedged = stream(providers, health)
+        list(hedged)
+        assert hedged.winner == ("openrouter", "fake-or")
+        assert time.monotonic() - started < 0.5
+    assert health.is_degraded("groq")
+
+    started = time.monotonic()
+    hedged = stream(providers, health)
+    list(hedged)
+    assert hedged.winner == ("openrouter", "fake-or")
+    assert time.monotonic() - started < TIMEOUT
+
+
+def test_failing_primary_falls_back_immediately():
+    health = make_health()
+    started = time.monotonic()
+    hedged = stream(
+        {
+            "groq": FakeProvider(error_rate=1.0),
+            "openrouter": FakeProvider(),
+            "google": FakeProvider(),
+        },
+        health,
+    )
+    list(hedged)
+    assert hedged.winner == ("openrouter", "fake-or")
+    assert time.monotonic() - started < TIMEOUT
+
+
+def test_every_candidate_failing_raises_the_last_error():
+    health = make_health()
+    hedged = stream(
+        {
+            "groq": FakeProvider(error_rate=1.0),
+            "openrouter": FakeProvider(error_rate=1.0),
+            "google": FakeProvider(error_rate=1.0),
+        },
+        health,
+    )
+    with pytest.raises(RuntimeError, match="fake-gemini"):
+        list(hedged)
+    assert hedged.winner is None
+
+
+def test_hanging_provider_without_fallbacks_times_out():
+    health = make_health()
+    started = time.monotonic()
+    hedged = stream({"groq": FakeProvider(first_token_delay=5.0)}, health, {})
+    with pytest.raises(TimeoutError):
+        list(hedged)
+    assert time.monotonic() - started < 3 * TIMEOUT
+    assert health.snapshot()["groq"]["score"] > 0
+
+
+def test_hanging_chain_times_out_and_reports_every_candidate():
+    health = make_health()
+    started = time.monotonic()
+    hedged = stream(
+        {
+            "groq": FakeProvider(first_token_delay=5.0),
+            "openrouter": FakeProvider(first_token_delay=5.0),
+            "google": FakeProvider(first_token_delay=5.0),
+        },
+        health,
+    )
+    with pytest.raises(TimeoutError):
+        list(hedged)
+    assert time.monotonic() - started < 5 * TIMEOUT
+    scores = health.snapshot()
+    assert all(scores[p]["score"] > 0 for p in ("groq", "openrouter", "google"))
+
+
+def test_flaky_chain_always_answers():
+    health = make_health()
+    providers = {
+        "groq": FakeProvider(error_rate=0.5, seed=1),
+        "openrouter": FakeProvider(first_token_delay=0.05, error_rate=0.3, seed=2),
+        "google": FakeProvider(),
+    }
+    winners = set()
+    for _ in range(20):
+        hedged = stream(providers, health)
+        assert list(hedged)
+        winners.add(hedged.winner[0])
+    assert winners <= {"groq", "openrouter", "google"}
+    assert providers["groq"].calls > 0